@@ -0,0 +1,260 @@
+"""
+Benchmark suite for GamesDB and DBWrapper on synthetic libraries of games. Measures loading the database at boot,
+inserts, updates and random picks with each combination of filters, along with peak and resident memory, and prints
+the results as JSON so runs from different commits can be compared.
+
+Run on desktop CPython from the repository root:
+    python benchmarks/games_db_suite.py --output results.json
+    python benchmarks/games_db_suite.py --profile pico
+    python benchmarks/games_db_suite.py --compare baseline.json results.json
+
+The full profile goes from 100 to 1,000,000 games, the pico profile keeps to library sizes and operation counts that
+fit in the heap of a Raspberry Pi Pico W.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from binary_games_file import BinaryGamesFile
+from game import Game
+from game_store import GameStore
+from games_db import GamesDB
+from games_db_wrapper import DBWrapper
+
+# Library sizes and number of timed operations of each kind for each profile
+PROFILES: {str: dict} = {
+    'full': {'sizes': (100, 1000, 10000, 100000, 1000000), 'writes': 1000, 'picks': 10000},
+    'pico': {'sizes': (100, 500, 1000), 'writes': 100, 'picks': 1000},
+}
+
+# Filters each random pick benchmark uses, as get_random_game keyword arguments other than the players
+PICK_FILTERS: {str: dict} = {
+    'players': {},
+    'duration': {'duration': 60},
+    'complexity': {'complexity': True},
+    'duration_complexity': {'duration': 60, 'complexity': True},
+    'weighted': {'duration': 60, 'mode': GamesDB.WEIGHTED},
+    'shuffle': {'duration': 60, 'mode': GamesDB.SHUFFLE},
+}
+
+
+def synthetic_game(rng: random.Random, game_id: int | None, name: str) -> Game:
+    """
+    Create a synthetic game with a spread of player counts, durations and complexities like a real collection
+
+    Args:
+        rng: random.Random, seeded source of the field values
+        game_id: int | None, ID of the game, None for a new game
+        name: str, name of the game
+
+    Returns:
+        Game: the synthetic game
+    """
+    min_players = rng.randint(1, 4)
+    return Game(game_id, name, min_players, rng.randint(min_players, 8), rng.randint(10, 180),
+                rng.randint(100, 500) / 100)
+
+
+def write_library(file_name: str, count: int):
+    """
+    Write a synthetic library straight to a database file in the format its extension picks, without going through
+    GamesDB so only loading it is measured
+
+    Args:
+        file_name: str, name of the database file
+        count: int, number of games in the library
+    """
+    rng = random.Random(count)
+    games = [synthetic_game(rng, game_id, f'Synthetic Game {game_id}') for game_id in range(1, count + 1)]
+    if file_name.endswith(BinaryGamesFile.EXTENSION):
+        store = GameStore()
+        for game in games:
+            store[game.id] = game
+        BinaryGamesFile.write_all(file_name, store, count)
+    else:
+        with open(file_name, 'w') as f:
+            for game in games:
+                f.write(f'{game}\n')
+
+
+def time_each(operations: list, run) -> float:
+    """
+    Time a list of operations and return the mean time of one
+
+    Args:
+        operations: list, arguments for each call of run, prepared before the timing starts
+        run: function called with each operation's arguments
+
+    Returns:
+        float: mean microseconds per operation
+    """
+    start = time.perf_counter()
+    for operation in operations:
+        run(operation)
+    return (time.perf_counter() - start) * 1e6 / max(1, len(operations))
+
+
+def bench_library(count: int, db_format: str, writes: int, picks: int) -> dict:
+    """
+    Run every benchmark against one library, each in a fresh copy of the database files
+
+    Args:
+        count: int, number of games in the library
+        db_format: str, 'txt' or 'bin'
+        writes: int, number of inserts and updates timed
+        picks: int, number of random picks timed for each filter
+
+    Returns:
+        dict: the results, times in seconds or microseconds per operation and memory in bytes
+    """
+    file_name = f'games.{db_format}'
+    write_library(file_name, count)
+    result = {'games': count, 'format': db_format}
+
+    # Boot load, timed without tracing since tracemalloc slows every allocation down
+    start = time.perf_counter()
+    db = DBWrapper(file_name)
+    result['load_s'] = time.perf_counter() - start
+    del db
+
+    # Memory of the same load, the peak while loading and what is still held by the loaded database
+    tracemalloc.start()
+    db = DBWrapper(file_name)
+    result['resident_bytes'], result['load_peak_bytes'] = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rng = random.Random(count + 1)
+    inserts = [synthetic_game(rng, None, f'Inserted Game {index}') for index in range(writes)]
+    result['insert_us'] = time_each(inserts, db.insert_game)
+
+    ids = list(db.db.games.keys())
+    updates = []
+    for _ in range(writes):
+        game_id = rng.choice(ids)
+        updates.append(synthetic_game(rng, game_id, db.db.games[game_id].name))
+    result['update_us'] = time_each(updates, db.update_game)
+
+    start = time.perf_counter()
+    db.flush()
+    result['flush_s'] = time.perf_counter() - start
+
+    players = [rng.randint(1, GamesDB.MAX_PLAYERS) for _ in range(picks)]
+    for label, kwargs in PICK_FILTERS.items():
+        result[f'random_{label}_us'] = time_each(players, lambda p: db.get_random_game(players=p, **kwargs))
+    return result
+
+
+def commit_id() -> str | None:
+    """
+    Helper function for the commit the benchmarks ran against, if the repository is a git checkout
+
+    Returns:
+        str | None: the commit hash or None if it couldn't be found
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(profile: str, formats: [str], sizes: [int] = None) -> dict:
+    """
+    Run the suite in a scratch directory, GamesDB keeps its files in the working directory
+
+    Args:
+        profile: str, name of the profile in PROFILES
+        formats: [str], database formats to benchmark
+        sizes: [int], default None, library sizes overriding the profile's
+
+    Returns:
+        dict: every result along with what they were run against
+    """
+    settings = PROFILES[profile]
+    report = {'profile': profile, 'commit': commit_id(), 'python': sys.version.split()[0], 'results': []}
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix='games_db_bench_')
+    try:
+        os.chdir(scratch)
+        for count in sizes or settings['sizes']:
+            for db_format in formats:
+                # GamesDB prints its progress and misses, keep it out of the JSON output
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    result = bench_library(count, db_format, settings['writes'], settings['picks'])
+                report['results'].append(result)
+                print(f'{count} games ({db_format}) done', file=sys.stderr)
+                for name in os.listdir():
+                    os.remove(name)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return report
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """
+    Print how each result changed between two reports, flagging anything slower or larger by more than the threshold
+
+    Args:
+        baseline: dict, earlier report
+        current: dict, later report
+        threshold: float, ratio above which a change counts as a regression
+
+    Returns:
+        int: number of regressions
+    """
+    earlier = {(result['games'], result['format']): result for result in baseline['results']}
+    regressions = 0
+    print('games,format,metric,baseline,current,ratio')
+    for result in current['results']:
+        before = earlier.get((result['games'], result['format']))
+        if before is None:
+            continue
+        for metric, value in result.items():
+            if metric in ('games', 'format') or not before.get(metric):
+                continue
+            ratio = value / before[metric]
+            flag = ' REGRESSION' if ratio > threshold else ''
+            regressions += bool(flag)
+            print(f'{result["games"]},{result["format"]},{metric},{before[metric]:.6g},{value:.6g},{ratio:.2f}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=PROFILES, default='full')
+    parser.add_argument('--formats', nargs='+', choices=('txt', 'bin'), default=['txt', 'bin'])
+    parser.add_argument('--sizes', nargs='+', type=int, help="library sizes, replacing the profile's")
+    parser.add_argument('--output', help='file to write the JSON report to instead of printing it')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two JSON reports instead of running the suite')
+    parser.add_argument('--threshold', type=float, default=1.2, help='ratio counted as a regression when comparing')
+    args = parser.parse_args()
+
+    if args.compare:
+        reports = []
+        for file_name in args.compare:
+            with open(file_name) as f:
+                reports.append(json.load(f))
+        sys.exit(1 if compare(*reports, args.threshold) else 0)
+
+    report = run(args.profile, args.formats, args.sizes)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
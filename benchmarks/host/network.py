@@ -0,0 +1,44 @@
+"""
+Desktop stand-in for MicroPython's network module, a station interface that connects at once to the loopback address so
+Webserver can run on CPython.
+"""
+STA_IF = 0
+AP_IF = 1
+
+
+class WLAN:
+    def __init__(self, interface: int = STA_IF):
+        """
+        Args:
+            interface: int, default STA_IF, the interface, only kept for show
+        """
+        self.interface = interface
+        self._active = False
+        self._connected = False
+
+    def active(self, is_active: bool = None) -> bool:
+        """
+        Turn the interface on or off, or get whether it is on when called without an argument
+        """
+        if is_active is not None:
+            self._active = bool(is_active)
+        return self._active
+
+    def connect(self, ssid: str = None, password: str = None):
+        """
+        Connect straight away, whatever the network name and password
+        """
+        self._connected = True
+
+    def disconnect(self):
+        self._connected = False
+
+    def isconnected(self) -> bool:
+        return self._connected
+
+    def ifconfig(self) -> (str, str, str, str):
+        """
+        Returns:
+            (str, str, str, str): the IP address, subnet mask, gateway and DNS server, all on the loopback network
+        """
+        return '127.0.0.1', '255.0.0.0', '127.0.0.1', '127.0.0.1'
@@ -0,0 +1,7 @@
+"""
+Desktop stand-in for MicroPython's ntptime module, the desktop's clock is already set.
+"""
+
+
+def settime():
+    pass
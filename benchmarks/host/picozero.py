@@ -0,0 +1,20 @@
+"""
+Desktop stand-in for the picozero library, the Pico's onboard LED only remembers whether it is on.
+"""
+
+
+class LED:
+    def __init__(self):
+        self.is_lit = False
+
+    def on(self):
+        self.is_lit = True
+
+    def off(self):
+        self.is_lit = False
+
+    def toggle(self):
+        self.is_lit = not self.is_lit
+
+
+pico_led = LED()
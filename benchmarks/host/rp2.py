@@ -0,0 +1,7 @@
+"""
+Desktop stand-in for MicroPython's rp2 module, the BOOTSEL button is never pressed.
+"""
+
+
+def bootsel_button() -> int:
+    return 0
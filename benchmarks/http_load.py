@@ -0,0 +1,339 @@
+"""
+HTTP load test for Webserver on desktop CPython. The webserver runs in a child process on a loopback port, with the
+stand-ins in benchmarks/host in place of the Pico's network, rp2, picozero and ntptime modules, and a synthetic library
+of games. Concurrent clients replay a mix of GET and POST requests against it and the requests per second, latency
+percentiles and the server's memory are printed as JSON so runs from different commits can be compared.
+
+Run on desktop CPython, Linux for the resident memory figures, from the repository root:
+    python benchmarks/http_load.py --output results.json
+    python benchmarks/http_load.py --clients 8 --requests 5000 --games 1000 --no-keep-alive
+    python benchmarks/http_load.py --compare baseline.json results.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCHMARKS, '..')
+sys.path.insert(0, ROOT)
+
+from games_db_suite import commit_id, write_library
+
+# Files the webserver reads from its working directory at startup
+SERVED_FILES = ('index_html.txt', 'status_alert_html.txt', 'style.css', 'static')
+
+# Requests each client picks from, with the relative weight of each, {name} is filled in with a new game name
+TRAFFIC: [(int, str, str, str)] = [
+    # weight, method, path, form body
+    (30, 'GET', '/', ''),
+    (10, 'GET', '/static/style.css', ''),
+    (20, 'GET', '/search?q=synthetic+gme+12', ''),
+    (15, 'GET', '/api/games?limit=50&players=3', ''),
+    (10, 'GET', '/shortlist/2/60/0', ''),
+    (5, 'GET', '/status', ''),
+    (10, 'POST', '/game', 'name={name}&min_players=2&max_players=4&duration=45&complexity=2.5'),
+]
+
+
+def serve(port: int, games: int, trace_memory: bool):
+    """
+    Run the webserver until it is sent SIGTERM, then print its memory as JSON. Called in the child process, with the
+    working directory already holding the served files.
+
+    Args:
+        port: int, loopback port to listen on
+        games: int, number of games in the synthetic library
+        trace_memory: bool, whether to trace the Python heap, which slows the server down
+    """
+    sys.path.insert(0, os.path.join(BENCHMARKS, 'host'))
+    from games_db_wrapper import DBWrapper
+    from webserver import Webserver
+
+    write_library('games.txt', games)
+    out = sys.stdout
+    if trace_memory:
+        tracemalloc.start()
+
+    async def run(ws: Webserver):
+        Webserver.PORT = port
+        await ws.start()
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        print('ready', file=out, flush=True)
+        await stop.wait()
+        ws.server.close()
+        # Let the connections the clients have closed finish up rather than cancelling them part way
+        others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if others:
+            await asyncio.wait(others, timeout=Webserver.KEEP_ALIVE_SECONDS)
+
+    # The webserver prints every request, keep it out of the results
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with Webserver(db=DBWrapper('games.txt')) as ws:
+            asyncio.run(run(ws))
+
+    memory = {}
+    if trace_memory:
+        memory['heap_bytes'], memory['heap_peak_bytes'] = tracemalloc.get_traced_memory()
+    print(json.dumps(memory), file=out, flush=True)
+
+
+async def read_response(reader) -> int:
+    """
+    Read one response, with a length or chunked, and return its status
+
+    Args:
+        reader: asyncio.StreamReader, stream of the responses
+
+    Returns:
+        int: the status code
+    """
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode().split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status
+
+
+async def client(port: int, schedule: list, keep_alive: bool, latencies: list, errors: list):
+    """
+    Send each request of a schedule in turn, over one kept alive connection or a new connection for each
+
+    Args:
+        port: int, loopback port of the webserver
+        schedule: list, the (method, path, body) requests to send
+        keep_alive: bool, whether to reuse the connection
+        latencies: list, seconds each request took, appended to
+        errors: list, description of each failed request, appended to
+    """
+    reader = writer = None
+    for method, path, body in schedule:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            request = (f'{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept-Encoding: gzip\r\n'
+                       f'{"" if keep_alive else "Connection: close" + chr(13) + chr(10)}')
+            if body:
+                request += f'Content-Type: application/x-www-form-urlencoded\r\nContent-Length: {len(body)}\r\n'
+            writer.write(f'{request}\r\n{body}'.encode())
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors.append(f'{status} {method} {path}')
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            # The connection can't be trusted after a failed request, the next request starts a new one
+            errors.append(f'{type(e).__name__} {method} {path}')
+            if writer is not None:
+                writer.close()
+                writer = None
+            continue
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+def percentile(values: [float], share: float) -> float:
+    """
+    Helper function for the value below which the given share of sorted values fall
+
+    Args:
+        values: [float], sorted values
+        share: float, from 0 to 1
+
+    Returns:
+        float: the percentile, 0 if there are no values
+    """
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+def resident_memory(pid: int) -> dict:
+    """
+    Helper function for the current and peak resident memory of a process, only available on Linux
+
+    Args:
+        pid: int, ID of the process
+
+    Returns:
+        dict: the resident and peak resident bytes, empty if they couldn't be read
+    """
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in ('VmRSS', 'VmHWM'):
+                    memory['rss_bytes' if name == 'VmRSS' else 'rss_peak_bytes'] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def run(clients: int, requests: int, games: int, keep_alive: bool, trace_memory: bool, port: int, seed: int) -> dict:
+    """
+    Start the webserver in a child process in a scratch directory, replay the traffic against it and collect the
+    results
+
+    Args:
+        clients: int, number of concurrent clients
+        requests: int, total number of requests across every client
+        games: int, number of games in the synthetic library
+        keep_alive: bool, whether each client reuses its connection
+        trace_memory: bool, whether the server traces its Python heap
+        port: int, loopback port for the webserver
+        seed: int, seed of the request mix
+
+    Returns:
+        dict: the results along with what they were run against
+    """
+    scratch = tempfile.mkdtemp(prefix='webserver_load_')
+    for name in SERVED_FILES:
+        source = os.path.join(ROOT, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(scratch, name))
+        elif os.path.exists(source):
+            shutil.copy(source, scratch)
+
+    command = [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port), '--games', str(games)]
+    if trace_memory:
+        command.append('--trace-memory')
+    server = subprocess.Popen(command, cwd=scratch, stdout=subprocess.PIPE, text=True)
+    try:
+        if server.stdout.readline().strip() != 'ready':
+            raise RuntimeError('The webserver failed to start')
+
+        rng = random.Random(seed)
+        weights = [weight for weight, *_ in TRAFFIC]
+        schedules = [[] for _ in range(clients)]
+        for index in range(requests):
+            _, method, path, body = rng.choices(TRAFFIC, weights)[0]
+            schedules[index % clients].append((method, path, body.format(name=f'Load+Game+{index}')))
+
+        latencies = []
+        errors = []
+
+        async def replay():
+            await asyncio.gather(*(client(port, schedule, keep_alive, latencies, errors) for schedule in schedules))
+
+        start = time.perf_counter()
+        asyncio.run(replay())
+        elapsed = time.perf_counter() - start
+
+        result = {'clients': clients, 'requests': requests, 'games': games, 'keep_alive': keep_alive,
+                  'requests_per_s': len(latencies) / elapsed, 'errors': len(errors)}
+        latencies.sort()
+        for label, share in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            result[f'{label}_ms'] = percentile(latencies, share) * 1000
+        result['max_ms'] = latencies[-1] * 1000 if latencies else 0
+        result.update(resident_memory(server.pid))
+
+        server.send_signal(signal.SIGTERM)
+        result.update(json.loads(server.stdout.readline() or '{}'))
+        if errors:
+            print(f'{len(errors)} failed requests, the first: {errors[0]}', file=sys.stderr)
+    finally:
+        if server.poll() is None:
+            server.kill()
+        server.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {'commit': commit_id(), 'python': sys.version.split()[0], 'results': [result]}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """
+    Print how each result changed between two reports, flagging anything slower or larger by more than the threshold,
+    for requests per second a drop by more than the threshold
+
+    Args:
+        baseline: dict, earlier report
+        current: dict, later report
+        threshold: float, ratio above which a change counts as a regression
+
+    Returns:
+        int: number of regressions
+    """
+    settings = ('clients', 'requests', 'games', 'keep_alive')
+    earlier = {tuple(result[name] for name in settings): result for result in baseline['results']}
+    regressions = 0
+    print('clients,requests,games,keep_alive,metric,baseline,current,ratio')
+    for result in current['results']:
+        key = tuple(result[name] for name in settings)
+        before = earlier.get(key)
+        if before is None:
+            continue
+        for metric, value in result.items():
+            if metric in settings or not before.get(metric):
+                continue
+            ratio = value / before[metric]
+            worse = 1 / ratio if metric == 'requests_per_s' and ratio else ratio
+            flag = ' REGRESSION' if worse > threshold else ''
+            regressions += bool(flag)
+            print(f'{",".join(str(part) for part in key)},{metric},{before[metric]:.6g},{value:.6g},{ratio:.2f}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=4, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=2000, help='requests across every client')
+    parser.add_argument('--games', type=int, default=500, help='games in the synthetic library')
+    parser.add_argument('--no-keep-alive', dest='keep_alive', action='store_false',
+                        help='open a new connection for every request')
+    parser.add_argument('--trace-memory', action='store_true', help='trace the peak Python heap of the server')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='file to write the JSON report to instead of printing it')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two JSON reports instead of running the load test')
+    parser.add_argument('--threshold', type=float, default=1.2, help='ratio counted as a regression when comparing')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.games, args.trace_memory)
+        return
+
+    if args.compare:
+        reports = []
+        for file_name in args.compare:
+            with open(file_name) as f:
+                reports.append(json.load(f))
+        sys.exit(1 if compare(*reports, args.threshold) else 0)
+
+    report = run(args.clients, args.requests, args.games, args.keep_alive, args.trace_memory, args.port, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
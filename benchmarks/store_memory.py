@@ -0,0 +1,89 @@
+"""
+Compare the memory used to hold a library of games as a dictionary of Game objects, the layout GamesDB used before the
+GameStore, against the GameStore column layout.
+
+Run on desktop CPython from the repository root:
+    python benchmarks/store_memory.py
+"""
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game import Game
+from game_store import GameStore
+
+
+class DictGame:
+    # The Game class as it was before it used slots, every instance carries its own __dict__
+    def __init__(self, game_id: int, name: str, min_players: int, max_players: int, duration: int, complexity: float):
+        self.id = int(game_id) if game_id is not None else None
+
+        self.name = name
+        self.min_players = int(min_players)
+        self.max_players = int(max_players)
+        self.duration = int(duration)
+        self.complexity = float(complexity)
+
+
+def synthetic_games(count: int) -> [tuple]:
+    """
+    Create the field values of a synthetic library of games, names are left encoded so that each build decodes its own
+    copy, the same as it would reading the database file
+
+    Args:
+        count: int, number of games in the library
+
+    Returns:
+        [tuple]: list of field tuples in the order Game takes them
+    """
+    rng = random.Random(count)
+    games = []
+    for game_id in range(1, count + 1):
+        min_players = rng.randint(1, 4)
+        games.append((game_id, f'Synthetic Game {game_id}'.encode(), min_players, rng.randint(min_players, 8),
+                      rng.randint(10, 180), rng.randint(100, 500) / 100))
+    return games
+
+
+def measure(build) -> int:
+    """
+    Measure the memory still held by whatever the build function returns
+
+    Args:
+        build: function that builds and returns a library
+
+    Returns:
+        int: bytes allocated and still held once the build returns
+    """
+    tracemalloc.start()
+    library = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del library
+    return current
+
+
+def main():
+    print('games,dict_of_games_bytes,game_store_bytes,ratio')
+    for count in (1000, 10000):
+        fields = synthetic_games(count)
+
+        def build_dict():
+            return {row[0]: DictGame(row[0], row[1].decode(), *row[2:]) for row in fields}
+
+        def build_store():
+            store = GameStore()
+            for row in fields:
+                store[row[0]] = Game(row[0], row[1].decode(), *row[2:])
+            return store
+
+        dict_bytes = measure(build_dict)
+        store_bytes = measure(build_store)
+        print(f'{count},{dict_bytes},{store_bytes},{dict_bytes / store_bytes:.1f}')
+
+
+if __name__ == '__main__':
+    main()
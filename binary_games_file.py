@@ -0,0 +1,270 @@
+import os
+import struct
+
+from game import Game
+from game_store import GameStore
+
+
+class BinaryGamesFile:
+    # Database file names ending with this extension are stored in the binary format instead of the txt format
+    EXTENSION = '.bin'
+
+    # Header at the start of the records file, the magic bytes and the highest game ID with a record slot
+    _MAGIC = b'GDB1'
+    _HEADER_FORMAT = '<4sI'
+    _HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+    # Every game gets a fixed size record: ID, min players, max players, duration, complexity and where its name sits in
+    # the name heap. An ID of 0 marks the slot of a deleted game.
+    _RECORD_FORMAT = '<IBBHfIH'
+    _RECORD_SIZE = struct.calcsize(_RECORD_FORMAT)
+    # The name heap offset and length are the last fields of a record
+    _NAME_FORMAT = '<IH'
+    _NAME_POSITION = _RECORD_SIZE - struct.calcsize(_NAME_FORMAT)
+
+    # Number of records read from flash at a time while loading
+    _READ_RECORDS = 32
+
+    def __init__(self, file_name: str):
+        """
+        Binary database format of fixed size records with the names held in a separate heap file.
+
+        The record for a game sits in the slot for its ID, so any game can be read or overwritten in place with a single
+        seek instead of parsing or rewriting the whole database. Names vary in length so they are appended to the name
+        heap file and the record holds their offset and length.
+
+        Args:
+            file_name: str, name of the records file, the name heap file has '.names' added to it
+        """
+        self.file_name = file_name
+        self.names_file_name = file_name + '.names'
+
+        # Highest game ID with a record slot, IDs below it without a game have an empty slot
+        self.max_id = 0
+        # Current size of the name heap, new names are written at this offset
+        self._names_size = 0
+
+        # Buffer reused for every single record read or written
+        self._record = bytearray(BinaryGamesFile._RECORD_SIZE)
+
+        # If the database files don't already exist, create them and print status to the console
+        files = os.listdir()
+        if self.file_name not in files or self.names_file_name not in files:
+            print(f'Creating {self.file_name}')
+            BinaryGamesFile.write_all(self.file_name, GameStore(), 0)
+
+    @staticmethod
+    def write_all(file_name: str, games: GameStore, max_id: int):
+        """
+        Write a complete binary database, replacing any existing files
+
+        Args:
+            file_name: str, name of the records file
+            games: GameStore, every game to write, in ID order
+            max_id: int, highest game ID handed out, which may belong to a deleted game
+        """
+        record = bytearray(BinaryGamesFile._RECORD_SIZE)
+        names_size = 0
+        with open(file_name, 'wb') as f, open(file_name + '.names', 'wb') as names:
+            f.write(struct.pack(BinaryGamesFile._HEADER_FORMAT, BinaryGamesFile._MAGIC, max_id))
+            next_id = 1
+            for game in games.values():
+                # Leave empty slots for the IDs of deleted games
+                for _ in range(next_id, game.id):
+                    f.write(bytes(BinaryGamesFile._RECORD_SIZE))
+                encoded = game.name.encode()
+                names.write(encoded)
+                BinaryGamesFile._pack_record(record, game, names_size, len(encoded))
+                f.write(record)
+                names_size += len(encoded)
+                next_id = game.id + 1
+            for _ in range(next_id, max_id + 1):
+                f.write(bytes(BinaryGamesFile._RECORD_SIZE))
+
+    def load(self) -> GameStore:
+        """
+        Read every game in the binary database, records are read in blocks into one preallocated buffer rather than
+        parsed from strings
+
+        Returns:
+            GameStore, column store of the games
+        """
+        games = GameStore()
+        with open(self.names_file_name, 'rb') as f:
+            names = f.read()
+        self._names_size = len(names)
+
+        with open(self.file_name, 'rb') as f:
+            magic, self.max_id = struct.unpack(BinaryGamesFile._HEADER_FORMAT, f.read(BinaryGamesFile._HEADER_SIZE))
+            if magic != BinaryGamesFile._MAGIC:
+                raise ValueError(f'{self.file_name} is not a binary games database')
+
+            buffer = bytearray(BinaryGamesFile._RECORD_SIZE * BinaryGamesFile._READ_RECORDS)
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                for offset in range(0, size - size % BinaryGamesFile._RECORD_SIZE, BinaryGamesFile._RECORD_SIZE):
+                    game = BinaryGamesFile._unpack_record(buffer, offset, names)
+                    if game:
+                        games[game.id] = game
+        return games
+
+    def read_game(self, game_id: int) -> Game | None:
+        """
+        Read a single game straight from its record slot without loading the rest of the database
+
+        Args:
+            game_id: int, ID of the game
+
+        Returns:
+            Game | None: the game or None if there is no game with that ID
+        """
+        if not 1 <= game_id <= self.max_id:
+            return None
+        with open(self.file_name, 'rb') as f:
+            f.seek(self._slot_offset(game_id))
+            f.readinto(self._record)
+        name_offset, name_length = struct.unpack_from(BinaryGamesFile._NAME_FORMAT, self._record,
+                                                      BinaryGamesFile._NAME_POSITION)
+        with open(self.names_file_name, 'rb') as f:
+            f.seek(name_offset)
+            name = f.read(name_length)
+        return BinaryGamesFile._unpack_record(self._record, 0, name, name_offset)
+
+    def write_game(self, game: Game):
+        """
+        Write a game into its record slot, overwriting the slot in place if the game is already in the database. The
+        name is only added to the name heap if it has changed.
+
+        Args:
+            game: Game, game object being written
+        """
+        encoded = game.name.encode()
+        name_offset = None
+
+        # Reuse the existing name in the heap if an updated game kept its name
+        existing = self.read_game(game.id)
+        if existing and existing.name == game.name:
+            name_offset = struct.unpack_from(BinaryGamesFile._NAME_FORMAT, self._record,
+                                             BinaryGamesFile._NAME_POSITION)[0]
+
+        if name_offset is None:
+            name_offset = self._names_size
+            with open(self.names_file_name, 'ab') as f:
+                f.write(encoded)
+            self._names_size += len(encoded)
+
+        BinaryGamesFile._pack_record(self._record, game, name_offset, len(encoded))
+        self._write_slot(game.id, self._record)
+
+    def append_games(self, games: [Game]):
+        """
+        Append many new games with one write to each file, the games must have consecutive IDs following the current
+        highest ID
+
+        Args:
+            games: [Game], new game objects being written, in ID order
+        """
+        records = bytearray(BinaryGamesFile._RECORD_SIZE * len(games))
+        names = bytearray()
+        for position in range(len(games)):
+            game = games[position]
+            encoded = game.name.encode()
+            BinaryGamesFile._pack_record(self._record, game, self._names_size + len(names), len(encoded))
+            records[position * BinaryGamesFile._RECORD_SIZE:(position + 1) * BinaryGamesFile._RECORD_SIZE] = \
+                self._record
+            names.extend(encoded)
+
+        with open(self.names_file_name, 'ab') as f:
+            f.write(names)
+        self._names_size += len(names)
+
+        with open(self.file_name, 'r+b') as f:
+            f.seek(self._slot_offset(self.max_id + 1))
+            f.write(records)
+            self.max_id = games[-1].id
+            f.seek(0)
+            f.write(struct.pack(BinaryGamesFile._HEADER_FORMAT, BinaryGamesFile._MAGIC, self.max_id))
+
+    def delete_game(self, game_id: int):
+        """
+        Empty the record slot of a game, its name is left behind in the heap
+
+        Args:
+            game_id: int, ID of the game being deleted
+        """
+        self._write_slot(game_id, bytes(BinaryGamesFile._RECORD_SIZE))
+
+    def _write_slot(self, game_id: int, record):
+        """
+        Helper function to overwrite the record slot for an ID, growing the file and header if it is a new highest ID
+
+        Args:
+            game_id: int, ID of the slot
+            record: bytes-like, packed record to write
+        """
+        with open(self.file_name, 'r+b') as f:
+            if game_id > self.max_id:
+                # Fill in empty slots for any IDs skipped over and record the new highest ID in the header
+                f.seek(self._slot_offset(self.max_id + 1))
+                for _ in range(self.max_id + 1, game_id):
+                    f.write(bytes(BinaryGamesFile._RECORD_SIZE))
+                self.max_id = game_id
+                f.write(record)
+                f.seek(0)
+                f.write(struct.pack(BinaryGamesFile._HEADER_FORMAT, BinaryGamesFile._MAGIC, self.max_id))
+            else:
+                f.seek(self._slot_offset(game_id))
+                f.write(record)
+
+    @staticmethod
+    def _slot_offset(game_id: int) -> int:
+        """
+        Helper function for the position of a game's record slot in the records file
+
+        Args:
+            game_id: int, ID of the game
+
+        Returns:
+            int: byte offset of the slot
+        """
+        return BinaryGamesFile._HEADER_SIZE + (game_id - 1) * BinaryGamesFile._RECORD_SIZE
+
+    @staticmethod
+    def _pack_record(record: bytearray, game: Game, name_offset: int, name_length: int):
+        """
+        Helper function to pack a game into a record buffer
+
+        Args:
+            record: bytearray, buffer the record is packed into
+            game: Game, game object being packed
+            name_offset: int, offset of the game's name in the name heap
+            name_length: int, length of the game's encoded name
+        """
+        # Player counts are stored in a byte, anything above that plays the same as the highest count on the switch
+        struct.pack_into(BinaryGamesFile._RECORD_FORMAT, record, 0, game.id, min(game.min_players, 255),
+                         min(game.max_players, 255), game.duration, game.complexity, name_offset, name_length)
+
+    @staticmethod
+    def _unpack_record(buffer, offset: int, names, names_start: int = 0) -> Game | None:
+        """
+        Helper function to unpack a record from a buffer into a game
+
+        Args:
+            buffer: bytes-like, buffer holding the record
+            offset: int, position of the record in the buffer
+            names: bytes, the name heap, or the part of it starting at names_start
+            names_start: int, default 0, offset in the name heap where names begins
+
+        Returns:
+            Game | None: the game or None if the record is an empty slot
+        """
+        game_id, min_players, max_players, duration, complexity, name_offset, name_length = struct.unpack_from(
+            BinaryGamesFile._RECORD_FORMAT, buffer, offset)
+        if not game_id:
+            return None
+        name_offset -= names_start
+        name = names[name_offset:name_offset + name_length].decode()
+        # Complexity is stored single precision, round it back to the hundredths it was entered with
+        return Game(game_id, name, min_players, max_players, duration, round(complexity, 2))
@@ -0,0 +1,112 @@
+"""
+Build the static assets the webserver serves, run on desktop CPython from the repository root before copying the files
+to the Pico:
+    python build_assets.py
+
+The page and the stylesheet are minified and gzipped into the static folder, along with assets.json, the manifest the
+webserver reads at startup to find each asset, its type and its entity tag. The stylesheet's link in the page gets the
+stylesheet's tag as a version, so browsers can keep the stylesheet for a year and still fetch a new one after a rebuild.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+
+# Folder the built assets are written to, copied to the Pico's flash as it is
+STATIC_FOLDER = 'static'
+
+# Each asset by the path it is served at, with the source file it is built from, the file it is built into and its
+# content type, an asset the page links to must come before the page
+ASSETS: {str: dict} = {
+    '/static/style.css': {'source': 'style.css', 'file': 'style.css.gz', 'type': 'text/css; charset=utf-8'},
+    '/': {'source': 'index_html.txt', 'file': 'index.html.gz', 'type': 'text/html; charset=utf-8'},
+}
+
+
+def minify_css(css: str) -> str:
+    """
+    Strip the comments and the whitespace that doesn't change the meaning of a stylesheet
+
+    Args:
+        css: str, the stylesheet
+
+    Returns:
+        str: the minified stylesheet
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_html(html: str) -> str:
+    """
+    Strip the indentation and blank lines of a page, every line break is kept so inline scripts that leave out
+    semicolons still parse the same
+
+    Args:
+        html: str, the page
+
+    Returns:
+        str: the minified page
+    """
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def tag(data: bytes) -> str:
+    """
+    Entity tag of an asset's bytes
+
+    Args:
+        data: bytes, the asset as served
+
+    Returns:
+        str: the first 16 hex digits of its SHA-256 hash
+    """
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def build(root: str = '.') -> dict:
+    """
+    Minify and gzip every asset into the static folder and write the manifest
+
+    Args:
+        root: str, default '.', folder holding the sources and the static folder
+
+    Returns:
+        dict: the manifest, keyed by the path each asset is served at
+    """
+    os.makedirs(os.path.join(root, STATIC_FOLDER), exist_ok=True)
+    manifest = {}
+    versions = {}
+    for path, asset in ASSETS.items():
+        with open(os.path.join(root, asset['source'])) as f:
+            text = f.read()
+        if asset['source'].endswith('.css'):
+            text = minify_css(text)
+        else:
+            text = minify_html(text)
+            # Point the page at the versions of the assets built before it
+            for asset_path, version in versions.items():
+                text = text.replace(f'"{asset_path}"', f'"{asset_path}?v={version}"')
+
+        data = text.encode()
+        # A fixed modification time keeps the gzipped bytes, and so the tags, the same between builds
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        file_name = asset['file']
+        with open(os.path.join(root, STATIC_FOLDER, file_name), 'wb') as f:
+            f.write(compressed)
+
+        versions[path] = tag(data)
+        manifest[path] = {'file': f'{STATIC_FOLDER}/{file_name}', 'source': asset['source'], 'type': asset['type'],
+                          'length': len(compressed), 'tag': versions[path]}
+        print(f'{path}: {asset["source"]} {len(data)} bytes minified, {len(compressed)} bytes gzipped')
+
+    with open(os.path.join(root, STATIC_FOLDER, 'assets.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == '__main__':
+    build()
@@ -0,0 +1,23 @@
+from binary_games_file import BinaryGamesFile
+from games_db import GamesDB
+
+
+def convert_db(source_name: str, target_name: str):
+    """
+    Convert a games database between the txt and binary formats, the format of each file is picked from its extension.
+    The target is written fresh with only the current state of each game.
+
+    Args:
+        source_name: str, name of the existing database file
+        target_name: str, name of the database file to create, replacing it if it exists
+    """
+    # Load the source database, replaying its records or reading its binary slots
+    db = GamesDB(source_name)
+
+    if target_name.endswith(BinaryGamesFile.EXTENSION):
+        BinaryGamesFile.write_all(target_name, db.games, db.max_id)
+    else:
+        with open(target_name, 'w') as f:
+            for game in db.games.values():
+                f.write(f'{game}\n')
+    print(f'Converted {len(db.games)} games from {source_name} to {target_name}')
@@ -0,0 +1,100 @@
+from game import Game
+
+# Column headers accepted for each game field, this project's own names followed by the names used in a BoardGameGeek
+# collection export, where the complexity is the community weight
+CSV_COLUMNS: {str: (str,)} = {
+    'name': ('name', 'objectname'),
+    'min_players': ('min_players', 'minplayers'),
+    'max_players': ('max_players', 'maxplayers'),
+    'duration': ('duration', 'playingtime'),
+    'complexity': ('complexity', 'avgweight'),
+}
+
+
+def parse_csv_rows(lines):
+    """
+    Generator of the rows of a CSV file, fields may be quoted with double quotes, quoted fields may contain commas,
+    escaped "" quotes and line breaks. MicroPython has no csv module so this covers what BoardGameGeek exports.
+
+    Args:
+        lines: iterable of the lines of the CSV file as strings
+
+    Returns:
+        generator of [str], the fields of each row
+    """
+    row = []
+    field = ''
+    quoted = False
+    for line in lines:
+        line = line.rstrip('\r\n')
+        position = 0
+        while position < len(line):
+            char = line[position]
+            if quoted:
+                if char == '"':
+                    # A doubled quote inside a quoted field is a literal quote, a single one ends the quoting
+                    if position + 1 < len(line) and line[position + 1] == '"':
+                        field += '"'
+                        position += 1
+                    else:
+                        quoted = False
+                else:
+                    field += char
+            elif char == '"':
+                quoted = True
+            elif char == ',':
+                row.append(field)
+                field = ''
+            else:
+                field += char
+            position += 1
+
+        # A line break inside a quoted field is part of the field, otherwise it ends the row
+        if quoted:
+            field += '\n'
+            continue
+        row.append(field)
+        if row != ['']:
+            yield row
+        row = []
+        field = ''
+
+
+def read_csv_games(lines):
+    """
+    Generator of the games in a CSV file whose first row is a header naming the columns, see CSV_COLUMNS for the
+    accepted names. Any other columns are ignored and a missing complexity is treated as 0.
+
+    Args:
+        lines: iterable of the lines of the CSV file as strings
+
+    Returns:
+        generator of Game | None, a game without an ID for each row, or None if the row couldn't be converted
+    """
+    rows = parse_csv_rows(lines)
+    try:
+        header = [column.strip().lower() for column in next(rows)]
+    except StopIteration:
+        return
+
+    # Find the position of each field's column from the first accepted name present in the header
+    positions = {}
+    for field, names in CSV_COLUMNS.items():
+        for name in names:
+            if name in header:
+                positions[field] = header.index(name)
+                break
+    # Complexity is the only optional column
+    missing = [field for field in CSV_COLUMNS if field != 'complexity' and field not in positions]
+    if missing:
+        raise ValueError(f'CSV header has no column for {", ".join(missing)}')
+
+    for row in rows:
+        try:
+            complexity = row[positions['complexity']] if 'complexity' in positions else ''
+            # Complexity is kept to the hundredths the web form allows
+            yield Game(None, row[positions['name']].strip(), row[positions['min_players']],
+                       row[positions['max_players']], row[positions['duration']],
+                       round(float(complexity), 2) if complexity else 0)
+        except (IndexError, ValueError):
+            yield None
@@ -0,0 +1,89 @@
+try:
+    import asyncio
+except ImportError:
+    # Older MicroPython firmware only has the asyncio module under its old name
+    import uasyncio as asyncio
+
+
+class Subscription:
+    def __init__(self, names):
+        """
+        One listener's view of an EventHub. Rather than a queue of every change, it holds the names of the values that
+        changed since the listener last took them, so however slowly the listener keeps up it never holds more than one
+        entry per value, and a burst of changes to the same value collapses into its latest.
+
+        Args:
+            names: iterable of str, names of the values the listener hasn't seen yet
+        """
+        self.pending: set = set(names)
+        # Cleared once the listener is unsubscribed, from its own task or another
+        self.active = True
+        # Set whenever a value changes, cleared by the listener before it takes the changes
+        self.changed = asyncio.Event()
+        if self.pending:
+            self.changed.set()
+
+
+class EventHub:
+    def __init__(self):
+        """
+        Latest value of each piece of device state, like the dial's duration or the last picked game, and the
+        listeners to tell when one of them changes
+        """
+        self.state: {str: object} = {}
+        self._subscriptions: [Subscription] = []
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, name: str, value):
+        """
+        Set a value and tell every listener, unless the value is the same as before
+
+        Args:
+            name: str, name of the value
+            value: the new value, anything that can be turned into JSON
+        """
+        if name in self.state and self.state[name] == value:
+            return
+        self.state[name] = value
+        for subscription in self._subscriptions:
+            subscription.pending.add(name)
+            subscription.changed.set()
+
+    def subscribe(self) -> Subscription:
+        """
+        Add a listener, every value already set counts as changed so the listener starts with all of them
+
+        Returns:
+            Subscription: the listener's subscription
+        """
+        subscription = Subscription(self.state)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Remove a listener, if it is still subscribed, and wake it so it sees it is no longer active
+
+        Args:
+            subscription: Subscription, the listener's subscription
+        """
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        subscription.active = False
+        subscription.changed.set()
+
+    def take(self, subscription: Subscription) -> {str: object}:
+        """
+        Take the latest value of everything that changed since the listener last took its changes
+
+        Args:
+            subscription: Subscription, the listener's subscription
+
+        Returns:
+            {str: object}: the changed values by name, empty if nothing changed
+        """
+        changes = {name: self.state[name] for name in subscription.pending}
+        subscription.pending.clear()
+        return changes
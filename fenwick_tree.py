@@ -0,0 +1,91 @@
+from array import array
+
+
+class FenwickTree:
+    def __init__(self, weights: [int]):
+        """
+        Fenwick tree, or binary indexed tree, over a list of integer weights. The sum of any prefix of the weights, a
+        change to a single weight and finding the position a running total falls in all take O(log n), which is what
+        drawing a weighted random position from a slice of the weights needs.
+
+        Args:
+            weights: [int], starting weight of each position, all non-negative
+        """
+        self._size = len(weights)
+
+        # Position i of the tree holds the sum of the weights in the range (i - lowest set bit of i, i], counted from 1
+        self._tree = array('I', [0] * (self._size + 1))
+        for position in range(1, self._size + 1):
+            self._tree[position] += weights[position - 1]
+            parent = position + (position & -position)
+            if parent <= self._size:
+                self._tree[parent] += self._tree[position]
+
+        # Largest power of two not above the size, where the search for a running total starts
+        self._top = 1
+        while self._top * 2 <= self._size:
+            self._top *= 2
+
+    def __len__(self) -> int:
+        return self._size
+
+    def prefix_sum(self, end: int) -> int:
+        """
+        Sum the weights of every position before the end position
+
+        Args:
+            end: int, exclusive end position
+
+        Returns:
+            int: sum of the weights
+        """
+        total = 0
+        position = end
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def weight(self, position: int) -> int:
+        """
+        Get the current weight of a single position
+
+        Args:
+            position: int, position of the weight
+
+        Returns:
+            int: the weight
+        """
+        return self.prefix_sum(position + 1) - self.prefix_sum(position)
+
+    def add(self, position: int, change: int):
+        """
+        Change the weight of a single position
+
+        Args:
+            position: int, position of the weight
+            change: int, amount added to the weight, negative to reduce it
+        """
+        position += 1
+        while position <= self._size:
+            self._tree[position] += change
+            position += position & -position
+
+    def find(self, total: int) -> int:
+        """
+        Find the position whose weight the running total of all weights falls within
+
+        Args:
+            total: int, running total, from 0 up to but not including the sum of all the weights
+
+        Returns:
+            int: the first position whose prefix sum, including its own weight, is greater than the total
+        """
+        position = 0
+        step = self._top
+        while step:
+            if position + step <= self._size and self._tree[position + step] <= total:
+                position += step
+                total -= self._tree[position]
+            step >>= 1
+        return position
@@ -1,4 +1,7 @@
 class Game:
+    # Games are held in the GameStore columns and only created as views when read out, slots keep each view small
+    __slots__ = ('id', 'name', 'min_players', 'max_players', 'duration', 'complexity')
+
     def __init__(self, game_id: int, name: str, min_players: int, max_players: int, duration: int, complexity: float):
         # ID will be set when inserting into or read from the database
         self.id = int(game_id) if game_id is not None else None
@@ -0,0 +1,285 @@
+from array import array
+
+from game import Game
+
+
+class GameStore:
+    # Once more than this share of the name heap belongs to replaced names, the heap is rebuilt
+    _NAME_COMPACTION_RATIO = 0.5
+
+    def __init__(self):
+        """
+        Compact column store of every game, used by GamesDB in place of a dictionary of Game objects.
+
+        Each field is held in its own typed array, one row per game, so a game costs a handful of bytes instead of a
+        full object with its own __dict__. The names are all held in one UTF-8 byte heap and found by offset and length.
+        Rows are kept in ID order so a game is found by binary search on the ID column, and Game objects are only
+        created as lightweight views when a game is read out of the store.
+
+        The store acts like the dictionary it replaces, keyed by game ID, so code iterating items() or values() works
+        unchanged.
+        """
+        self._ids = array('I')
+        self._min_players = array('H')
+        self._max_players = array('H')
+        self._durations = array('H')
+        self._complexities = array('f')
+
+        # Name heap and where each row's name sits within it
+        self._names = bytearray()
+        self._name_offsets = array('I')
+        self._name_lengths = array('H')
+        # Bytes in the name heap no longer referenced by any row, left behind by renamed or deleted games
+        self._dead_name_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, game_id: int) -> bool:
+        return self._find_row(game_id) >= 0
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __getitem__(self, game_id: int) -> Game:
+        row = self._find_row(game_id)
+        if row < 0:
+            raise KeyError(game_id)
+        return self._view(row)
+
+    def __setitem__(self, game_id: int, game: Game):
+        row = self._find_row(game_id)
+        if row >= 0:
+            self._write_row(row, game)
+        else:
+            self._insert_row(game_id, game)
+
+    def __delitem__(self, game_id: int):
+        row = self._find_row(game_id)
+        if row < 0:
+            raise KeyError(game_id)
+        self._delete_row(row)
+
+    def get(self, game_id: int, default=None) -> Game | None:
+        """
+        Get the game with the given ID, or the default if there isn't one
+
+        Args:
+            game_id: int, ID of the game
+            default: value returned if there is no game with that ID
+
+        Returns:
+            Game | None: view of the game or the default
+        """
+        row = self._find_row(game_id)
+        return self._view(row) if row >= 0 else default
+
+    def pop(self, game_id: int, *default) -> Game | None:
+        """
+        Remove the game with the given ID from the store and return it
+
+        Args:
+            game_id: int, ID of the game
+            default: optional value returned if there is no game with that ID, otherwise KeyError is raised
+
+        Returns:
+            Game | None: view of the removed game or the default
+        """
+        row = self._find_row(game_id)
+        if row < 0:
+            if default:
+                return default[0]
+            raise KeyError(game_id)
+        game = self._view(row)
+        self._delete_row(row)
+        return game
+
+    def keys(self):
+        """
+        Generator of every game ID in ID order
+        """
+        return iter(self._ids)
+
+    def values(self):
+        """
+        Generator of a view of every game in ID order, each view is only created as it is reached
+        """
+        for row in range(len(self._ids)):
+            yield self._view(row)
+
+    def items(self):
+        """
+        Generator of every game ID and a view of that game in ID order
+        """
+        for row in range(len(self._ids)):
+            yield self._ids[row], self._view(row)
+
+    def _bisect_ids(self, game_id: int) -> int:
+        """
+        Helper function to binary search the ID column for the first row whose ID is not less than the given ID
+
+        Args:
+            game_id: int, ID of the game
+
+        Returns:
+            int: row of the game if it is in the store, otherwise the row it would be inserted at
+        """
+        lo, hi = 0, len(self._ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ids[mid] < game_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find_row(self, game_id: int) -> int:
+        """
+        Helper function to find a game's row in the store
+
+        Args:
+            game_id: int, ID of the game
+
+        Returns:
+            int: row of the game or -1 if it isn't in the store
+        """
+        row = self._bisect_ids(game_id)
+        if row < len(self._ids) and self._ids[row] == game_id:
+            return row
+        return -1
+
+    def _view(self, row: int) -> Game:
+        """
+        Helper function to create a Game view of a row
+
+        Args:
+            row: int, row of the game
+
+        Returns:
+            Game: new game object holding a copy of the row
+        """
+        offset = self._name_offsets[row]
+        name = self._names[offset:offset + self._name_lengths[row]].decode()
+        # Complexity is stored single precision, round it back to the hundredths it was entered with
+        return Game(self._ids[row], name, self._min_players[row], self._max_players[row], self._durations[row],
+                    round(self._complexities[row], 2))
+
+    def _add_name(self, name: str) -> (int, int):
+        """
+        Helper function to append a name to the end of the name heap
+
+        Args:
+            name: str, name of the game
+
+        Returns:
+            (int, int): offset and length of the name in the heap
+        """
+        encoded = name.encode()
+        offset = len(self._names)
+        self._names.extend(encoded)
+        return offset, len(encoded)
+
+    def _insert_row(self, game_id: int, game: Game):
+        """
+        Helper function to add a row for a new game, new games normally have the highest ID and are simply appended
+
+        Args:
+            game_id: int, ID of the game
+            game: Game, game object being added
+        """
+        offset, length = self._add_name(game.name)
+        if not self._ids or self._ids[-1] < game_id:
+            self._ids.append(game_id)
+            self._min_players.append(game.min_players)
+            self._max_players.append(game.max_players)
+            self._durations.append(game.duration)
+            self._complexities.append(game.complexity)
+            self._name_offsets.append(offset)
+            self._name_lengths.append(length)
+            return
+
+        # Otherwise splice the row in at its place in ID order
+        lo = self._bisect_ids(game_id)
+        self._ids = self._splice(self._ids, lo, game_id)
+        self._min_players = self._splice(self._min_players, lo, game.min_players)
+        self._max_players = self._splice(self._max_players, lo, game.max_players)
+        self._durations = self._splice(self._durations, lo, game.duration)
+        self._complexities = self._splice(self._complexities, lo, game.complexity)
+        self._name_offsets = self._splice(self._name_offsets, lo, offset)
+        self._name_lengths = self._splice(self._name_lengths, lo, length)
+
+    def _write_row(self, row: int, game: Game):
+        """
+        Helper function to overwrite an existing row with the state of a game
+
+        Args:
+            row: int, row of the game
+            game: Game, game object holding the new state
+        """
+        self._min_players[row] = game.min_players
+        self._max_players[row] = game.max_players
+        self._durations[row] = game.duration
+        self._complexities[row] = game.complexity
+
+        # A new name that fits is written over the old one, otherwise the old one is abandoned in the heap
+        encoded = game.name.encode()
+        offset, length = self._name_offsets[row], self._name_lengths[row]
+        if len(encoded) <= length:
+            self._names[offset:offset + len(encoded)] = encoded
+            self._name_lengths[row] = len(encoded)
+            self._dead_name_bytes += length - len(encoded)
+        else:
+            self._name_offsets[row], self._name_lengths[row] = self._add_name(game.name)
+            self._dead_name_bytes += length
+            self._compact_names_if_needed()
+
+    def _delete_row(self, row: int):
+        """
+        Helper function to remove a row from every column
+
+        Args:
+            row: int, row of the game
+        """
+        self._dead_name_bytes += self._name_lengths[row]
+        self._ids = self._splice(self._ids, row)
+        self._min_players = self._splice(self._min_players, row)
+        self._max_players = self._splice(self._max_players, row)
+        self._durations = self._splice(self._durations, row)
+        self._complexities = self._splice(self._complexities, row)
+        self._name_offsets = self._splice(self._name_offsets, row)
+        self._name_lengths = self._splice(self._name_lengths, row)
+        self._compact_names_if_needed()
+
+    @staticmethod
+    def _splice(column: array, row: int, *value) -> array:
+        """
+        Helper function to insert a value into, or remove a row from, a column. MicroPython arrays have no insert() or
+        del, so the column is rebuilt around the row, this is only used for deletes and out of order inserts.
+
+        Args:
+            column: array, column being changed
+            row: int, row being inserted at or removed
+            value: optional value to insert at the row, if left out the row is removed
+
+        Returns:
+            array: the new column
+        """
+        if value:
+            head = column[:row]
+            head.append(value[0])
+            return head + column[row:]
+        return column[:row] + column[row + 1:]
+
+    def _compact_names_if_needed(self):
+        """
+        Helper function to rebuild the name heap without abandoned names once they take up too much of it
+        """
+        if self._dead_name_bytes <= len(self._names) * GameStore._NAME_COMPACTION_RATIO:
+            return
+        names = bytearray()
+        for row in range(len(self._ids)):
+            offset, length = self._name_offsets[row], self._name_lengths[row]
+            self._name_offsets[row] = len(names)
+            names.extend(self._names[offset:offset + length])
+        self._names = names
+        self._dead_name_bytes = 0
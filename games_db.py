@@ -1,13 +1,92 @@
 import os
 import random
+import time
+from collections import OrderedDict
 
+try:
+    from time import ticks_ms, ticks_diff
+except ImportError:
+    # Desktop CPython, used for benchmarking, has no ticks functions
+    from time import monotonic
+
+    def ticks_ms() -> int:
+        return int(monotonic() * 1000)
+
+    def ticks_diff(end: int, start: int) -> int:
+        return end - start
+
+import metrics
+from binary_games_file import BinaryGamesFile
+from fenwick_tree import FenwickTree
 from game import Game
+from game_store import GameStore
+from play_history import PlayHistory
+from shuffle_bag import ShuffleBag
+from sorted_index import SortedIndex
+from trigram_index import TrigramIndex
 
 
 class GamesDB:
     # Set class variable file name to None until it is set in the init
     _file_name = None
 
+    # Marker at the start of a record line that deletes the game with the ID that follows it
+    _TOMBSTONE = '-'
+
+    # Compact the database file once more than this share of its records are replaced or deleted games, but never
+    # bother while the file is still small
+    _COMPACTION_RATIO = 0.5
+    _COMPACTION_MIN_RECORDS = 32
+
+    # Writes are held in memory and flushed to flash together once this many are waiting or the oldest has waited this
+    # many milliseconds, whichever comes first
+    _FLUSH_RECORDS = 8
+    _FLUSH_MS = 2000
+
+    # Ways of picking a random game, every match equally likely, weighted by play history and favorites, or shuffled so
+    # no match repeats until every match has been picked
+    UNIFORM = 'uniform'
+    WEIGHTED = 'weighted'
+    SHUFFLE = 'shuffle'
+
+    # Constraints a nearest match can relax when no game meets every one of them
+    RELAXED_PLAYERS = 'players'
+    RELAXED_DURATION = 'duration'
+    RELAXED_COMPLEXITY = 'complexity'
+
+    # Distance of a nearest match in minutes past the time allowance, each player outside a game's range counts as this
+    # many minutes and each point of complexity below the hard game cut-off as this many
+    _PLAYER_DISTANCE = 30
+    _COMPLEXITY_DISTANCE = 20
+
+    # Seconds between bringing the weights of games still recovering from a pick up to date, the weights only change by
+    # a fraction of a percent in this time
+    _WEIGHT_REFRESH_SECONDS = 60 * 60
+
+    # A search match must share at least this percentage of the search's trigrams, which leaves room for a typo or two
+    _SEARCH_MIN_SHARED_PERCENT = 40
+
+    # Most shuffle bags kept at once, the least recently used query loses its bag first
+    _BAG_LIMIT = 8
+
+    # An import of fewer than one game for this many already stored is added to the indexes a game at a time
+    _BULK_INDEX_RATIO = 16
+
+    # The rotary switch for the number of players only offers 1 through 8 players
+    MAX_PLAYERS = 8
+
+    # Look for games that are +/- this many minutes from the given duration, expanded when complex games are wanted
+    TIME_ALLOWANCE = 20
+    COMPLEX_TIME_ALLOWANCE = 30
+
+    # The duration dial stops at 180 minutes, every window the dial can ask for ends below this key, so the duration
+    # indexes precompute where each of these keys starts and a dial lookup never needs a binary search
+    MAX_DURATION = 180
+    _DURATION_TABLE_SIZE = MAX_DURATION + COMPLEX_TIME_ALLOWANCE + 2
+
+    # Complexity ranking keys hold the complexity in hundredths above the ID, this is the span reserved for the ID
+    _RANK_ID_SPAN = 1 << 20
+
     # Set up the context manager decorator that will be used on functions that need to open the database file
     # txt_context_manager takes a function as a required argument, the function it is decorating
     # wrapper takes in any args and kwargs of the function being decorated, it will require a method kwarg to properly
@@ -33,6 +112,54 @@ class GamesDB:
 
         self.max_id = 0
 
+        # Number of record lines in the database file, live or dead, used to decide when to compact
+        self._record_count = 0
+
+        # Line numbers of any records in the database txt file that couldn't be read
+        self.malformed_lines: [int] = []
+
+        # Writes waiting to be flushed to the database file, a game to write or the ID of a game to delete, and when the
+        # oldest of them was made
+        self._pending_writes: [Game | int] = []
+        self._pending_since = 0
+
+        # Index of the IDs of every game that can be played by each number of players on the rotary switch, each kept
+        # sorted by duration
+        self._player_index: {int: SortedIndex} = {
+            players: SortedIndex(GamesDB._DURATION_TABLE_SIZE) for players in range(1, GamesDB.MAX_PLAYERS + 1)
+        }
+
+        # Every game ranked by complexity, the top 25% of this ranking are the hard games
+        self._complexity_index = SortedIndex()
+        # Ranking key of the easiest hard game, None while there are no games
+        self._hard_cutoff: int | None = None
+        # Same as the player index, but only holding the hard games so complexity is just another window lookup
+        self._hard_index: {int: SortedIndex} = {
+            players: SortedIndex(GamesDB._DURATION_TABLE_SIZE) for players in range(1, GamesDB.MAX_PLAYERS + 1)
+        }
+
+        # Index of every game's normalized name to its ID, for duplicate checks and looking games up by name
+        self._name_index: {str: int} = {}
+        # Index of the trigrams in every game's normalized name, for fuzzy name searches
+        self._trigram_index = TrigramIndex()
+
+        # Games picked recently and favorite boosts, kept next to the database file and used for weighted picks
+        self.history = PlayHistory(f'{db_name}.history')
+
+        # Shuffle bag of each recent query, keyed by the players, duration and complexity parameters, least recently used
+        # first, and the IDs of games whose match with the bags may have changed and still need patching into them
+        self._bags: OrderedDict = OrderedDict()
+        self._bag_patches: [int] = []
+
+        # A database file with the binary extension is kept in the fixed size record format, updated in place
+        if db_name.endswith(BinaryGamesFile.EXTENSION):
+            self._binary_file = BinaryGamesFile(db_name)
+            self.games: GameStore = self._binary_file.load()
+            self.max_id = self._binary_file.max_id
+            self._build_indexes(self.games)
+            return
+        self._binary_file = None
+
         # If the database file doesn't already exist, create it and print status to the console
         if GamesDB._file_name not in os.listdir():
             # TODO: dealing with reading/writing files needs a try/except around it
@@ -44,71 +171,237 @@ class GamesDB:
 
         # Get all the games from the database file
         # KEY NOTE: CHANGED TO INTEGER ID VALUE INSTEAD OF STRING VALUE NAME
-        self.games: {int: Game} = self.read_all_games(method='r')
+        self.games: GameStore = self.read_all_games(method='r')
 
+    @metrics.timed('db.read_all_games')
     @txt_context_manager
-    def read_all_games(self, **kwargs) -> {int: Game}:
+    def read_all_games(self, **kwargs) -> GameStore:
         """
-        Read all the games from the database txt file, expecting kwargs arguments with the file object
+        Read all the games from the database txt file by replaying its records, expecting kwargs arguments with the file
+        object. The file is an append-only log, a game line that repeats an earlier ID replaces that game and a
+        tombstone line removes it, so the latest record for each ID wins.
+
+        The file is streamed one line at a time straight into the store, so loading never holds more than a single line
+        of the file in memory. Lines that can't be parsed are reported and skipped rather than stopping the load.
 
         Returns:
-            {int: Game}, dictionary of games where key is id of the game
+            GameStore, column store of the games that acts as a dictionary where key is id of the game
         """
+        games = GameStore()
+        self.malformed_lines = []
         # File object should be passed in kwargs from the context manager function
         if 'file' in kwargs:
-            # Read contents and split by line and commas
-            # TODO: this could possibly be replaced with self._get_file_lines()
-            contents = kwargs['file'].read()
-            lines = [tuple(line.split(',')) for line in contents.split('\n') if line != '']
-            if lines:
-                # Set the max ID to the last ID found from the txt file
-                self.max_id = lines[-1][0]
-            return {int(line[0]): Game(*line) for line in lines}
-        return {}
+            f = kwargs['file']
+            line_number = 0
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                line_number += 1
+                line = line.rstrip('\r\n')
+                if not line:
+                    continue
+                self._record_count += 1
+
+                try:
+                    # A tombstone record deletes the game with the ID that follows the marker
+                    if line.startswith(GamesDB._TOMBSTONE):
+                        game_id = int(line[len(GamesDB._TOMBSTONE):])
+                        games.pop(game_id, None)
+                    # Otherwise the record is the latest state of the game, replacing any earlier record
+                    else:
+                        game = GamesDB._parse_record(line)
+                        game_id = game.id
+                        games[game_id] = game
+                except (ValueError, TypeError) as e:
+                    # Report the bad line and carry on with the rest of the file
+                    print(f'Skipping malformed line {line_number} in {GamesDB._file_name}: {e}')
+                    self.malformed_lines.append(line_number)
+                    continue
+
+                # Track the highest ID seen, including deleted games, so IDs are never handed out twice
+                if game_id > self.max_id:
+                    self.max_id = game_id
+
+            # Only index the final state of each game once the whole file has been replayed
+            self._build_indexes(games)
+        return games
+
+    @staticmethod
+    def _parse_record(line: str) -> Game:
+        """
+        Helper function to parse a game record line written by Game.__repr__. The name is everything between the ID
+        and the last four fields, so names containing commas are read back whole.
+
+        Args:
+            line: str, record line without its trailing newline
+
+        Returns:
+            Game: the game the line describes
+        """
+        fields = line.split(',')
+        if len(fields) < 6:
+            raise ValueError(f'expected 6 fields but found {len(fields)}')
+        return Game(fields[0], ','.join(fields[1:-4]), *fields[-4:])
 
-    def get_all_games(self) -> {int: Game}:
+    def get_all_games(self) -> GameStore:
         """
-        Return the dictionary of games as the contents of the database
+        Return the store of games as the contents of the database
         """
         return self.games
 
-    @txt_context_manager
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """
+        Normalize a game name so that names differing only in case, spacing or URL encoded spaces compare equal
+
+        Args:
+            name: str, name of the game
+
+        Returns:
+            str: normalized name of the game
+        """
+        # MicroPython strings have no casefold(), lower() is the closest available
+        return ' '.join(name.replace('%20', ' ').split()).lower()
+
+    @metrics.timed('db.get_game_by_name')
+    def get_game_by_name(self, name: str) -> Game | None:
+        """
+        Look up a game by its name, ignoring differences in case, spacing and URL encoded spaces
+
+        Args:
+            name: str, name of the game
+
+        Returns:
+            Game | None: the game with that name or None if there isn't one
+        """
+        game_id = self._name_index.get(GamesDB.normalize_name(name))
+        return self.games[game_id] if game_id is not None else None
+
+    @metrics.timed('db.search_games')
+    def search_games(self, query: str, k: int = 10) -> [Game]:
+        """
+        Search for games by name, tolerating typos. Only the games sharing trigrams with the search are looked at, they
+        are ranked by how many of the search's trigrams they share and then by how few of their own are left over, so
+        the start of a name typed so far ranks the shortest names that begin with it first.
+
+        Args:
+            query: str, the search, normalized the same way as names
+            k: int, default 10, most games to return
+
+        Returns:
+            [Game]: up to k games, best match first
+        """
+        name = GamesDB.normalize_name(query)
+        if not name:
+            return []
+        query_trigrams = len(TrigramIndex.trigrams(name))
+        min_shared = max(1, (query_trigrams * GamesDB._SEARCH_MIN_SHARED_PERCENT + 99) // 100)
+
+        ranked = []
+        for game_id, shared in self._trigram_index.search(name, min_shared).items():
+            game = self.games[game_id]
+            left_over = len(TrigramIndex.trigrams(GamesDB.normalize_name(game.name))) - shared
+            ranked.append((-shared, left_over, game_id, game))
+        ranked.sort(key=lambda entry: entry[:3])
+        return [entry[3] for entry in ranked[:k]]
+
+    @metrics.timed('db.insert_game')
     def insert_game(self, game: Game, **kwargs) -> int:
         """
-        Insert a game into the database, expecting file object in kwargs
+        Insert a game into the database
 
         Args:
             game: Game, game object that is being written into the database file
-            kwargs: expecting file object under key 'file'
+            kwargs: unused, accepted so callers still passing the file method keep working
 
         Returns:
              int: status of the insert, 201 success 40x failed
         """
-        # File object should be passed in from the context manager
-        if 'file' in kwargs:
-            # Check to ensure game name isn't already in records by compiling names from records
-            names = [game.name for key, game in self.games]
-            if game.name not in names:
-                # Ensure game ID is none as a new game
-                if game.id is None:
-                    # Increment max id and assign to current new game
-                    self.max_id += 1
-                    game.id = self.max_id
-                # Write the new game to the file
-                # TODO: This may cause issues, depending on whether it correctly uses __repr__ on the game object
-                kwargs['file'].write(f'{game}\n')
-
-                # Add the game to the dictionary of records
-                self.games[game.id] = game
-                return 201
-            else:
-                return 409  # Conflict, already exists
+        # Check to ensure game name isn't already in records using the name index
+        if GamesDB.normalize_name(game.name) not in self._name_index:
+            # Ensure game ID is none as a new game
+            if game.id is None:
+                # Increment max id and assign to current new game
+                self.max_id += 1
+                game.id = self.max_id
+            # Queue the new game to be written to the file
+            self._queue_write(game)
+
+            # Add the game to the store of records and the indexes
+            self.games[game.id] = game
+            self._index_game(game)
+            self._patch_bags([game.id])
+            return 201
         else:
-            return 400  # Bad request, text file was somehow not included to open
+            return 409  # Conflict, already exists
+
+    @metrics.timed('db.import_games')
+    def import_games(self, games) -> (int, int, int):
+        """
+        Insert many games into the database at once. Every game is validated and checked for duplicates in memory, the
+        indexes are updated in a single pass and all the new records are persisted with one write.
+
+        Args:
+            games: iterable of Game objects to import, None entries count as invalid rows
+
+        Returns:
+            (int, int, int): number of games imported, skipped as duplicates and skipped as invalid
+        """
+        new_games = []
+        duplicates = 0
+        invalid = 0
+        for game in games:
+            if game is None or not GamesDB.is_valid_game(game):
+                invalid += 1
+                continue
+            # Duplicates within the import itself are caught since each new name joins the name index straight away
+            name = GamesDB.normalize_name(game.name)
+            if name in self._name_index:
+                duplicates += 1
+                continue
+
+            # Imported games always get a new ID
+            self.max_id += 1
+            game.id = self.max_id
+            self._name_index[name] = game.id
+            self.games[game.id] = game
+            new_games.append(game)
+
+        if new_games:
+            self._write_games(new_games)
+            if len(new_games) * GamesDB._BULK_INDEX_RATIO < len(self.games):
+                # A small batch, like one part of an upload imported between other work, is cheaper to insert into the
+                # sorted indexes one game at a time than to sort every index again
+                for game in new_games:
+                    self._index_game(game)
+            else:
+                self._build_indexes(self.games, new_games)
+                # The hard games were rebuilt from scratch so the complexity bags start over
+                for query in [query for query in self._bags if query[2]]:
+                    del self._bags[query]
+            self._patch_bags([game.id for game in new_games])
+        return len(new_games), duplicates, invalid
 
+    @staticmethod
+    def is_valid_game(game: Game) -> bool:
+        """
+        Check that a game's fields make sense before it is stored
+
+        Args:
+            game: Game, game object being checked
+
+        Returns:
+            bool: whether the game can be stored
+        """
+        return bool(GamesDB.normalize_name(game.name)) and 1 <= game.min_players <= game.max_players and \
+            game.duration > 0 and 0 <= game.complexity <= 5
+
+    @metrics.timed('db.update_game')
     def update_game(self, game: Game) -> int:
         """
-        Update a game in the current records
+        Update a game in the current records by appending its new state to the end of the database txt file, the earlier
+        record is left in place and skipped when the file is replayed, or by overwriting its record in a binary file
 
         Args:
             game: Game, game object that is being updated
@@ -116,63 +409,307 @@ class GamesDB:
         Returns:
             int: value representing whether update was successful
         """
-        # Get all the file lines from the database document
-        lines = self._get_file_lines(method='r')
+        # The updating game's ID must already be in records
+        if game.id not in self.games:
+            return 404  # Error, could not find the updating game based on ID
 
-        # Iterate the lines to check for the game being updated
-        for x in range(len(lines)):
-            line = lines[x]
-            if line:
-                # Extract the game id from each line
-                game_id = int(line[:line.index(',')])
+        # The updated name can't belong to a different game
+        if self._name_index.get(GamesDB.normalize_name(game.name), game.id) != game.id:
+            return 409  # Conflict, already exists
 
-                # If the line's id matches the updating game's id
-                if game_id == game.id:
-                    # Replace the line with the updated __repr__ information
-                    lines[x] = f'{game.__repr__()}\n'
-                    # Rewrite the updated list of lines to the database document
-                    self._rewrite_file_lines(lines, method='w')
+        # Queue the updated game as a single record instead of rewriting the file
+        self._queue_write(game)
 
-                    # Update the games dictionary attribute with the updated game information
-                    self.games[game.id] = game
-                    return 201  # Successfully updated game information
-        return 404  # Error, could not find the updating game based on ID
+        # Update the games store and the indexes with the updated game information
+        self._unindex_game(self.games[game.id])
+        self.games[game.id] = game
+        self._index_game(game)
+        self._patch_bags([game.id])
+        return 201  # Successfully updated game information
 
-    @txt_context_manager
-    def _get_file_lines(self, **kwargs) -> [str]:
+    @metrics.timed('db.delete_game')
+    def delete_game(self, game_id: int) -> int:
         """
-        Helper function to get all the lines of the database document without creating Game objects
+        Delete a game from the current records by appending a tombstone record to the end of the database txt file, or
+        by emptying its record in a binary file
 
         Args:
-            kwargs: expects file object to be passed in from context manager
+            game_id: int, ID of the game that is being deleted
 
         Returns:
-            [str]: list of lines from the database document
+            int: value representing whether delete was successful
+        """
+        # The deleted game's ID must already be in records
+        if game_id not in self.games:
+            return 404  # Error, could not find the deleting game based on ID
+
+        # Queue the tombstone so the game is dropped the next time the file is replayed
+        self._queue_write(game_id)
+
+        # Remove the game from the games store and the indexes
+        self._unindex_game(self.games.pop(game_id))
+        self._patch_bags([game_id])
+        return 200  # Successfully deleted game
+
+    @staticmethod
+    def _player_range(game: Game) -> range:
+        """
+        Helper function for the numbers of players a game is indexed under, clamped to the rotary switch range
+
+        Args:
+            game: Game, game object being indexed
+
+        Returns:
+            range: every number of players on the rotary switch the game supports
+        """
+        return range(max(1, game.min_players), min(game.max_players, GamesDB.MAX_PLAYERS) + 1)
+
+    @staticmethod
+    def _complexity_key(game: Game) -> int:
+        """
+        Helper function for the key a game is ranked by in the complexity index. Ties in complexity are broken so the
+        game with the lower ID ranks harder, which keeps every key unique and the top 25% exactly sized.
+
+        Args:
+            game: Game, game object being ranked
+
+        Returns:
+            int: ranking key, higher is harder
+        """
+        return round(game.complexity * 100) * GamesDB._RANK_ID_SPAN + (GamesDB._RANK_ID_SPAN - 1 - game.id)
+
+    def _build_indexes(self, games: GameStore, new_games: [Game] = None):
+        """
+        Helper function to add many games to every index in one pass, sorting each index once at the end rather than
+        inserting games in order one at a time, the hard game index is then rebuilt from the complexity ranking
+
+        Args:
+            games: GameStore, store of every game, including any new games
+            new_games: [Game], default None, games being added to indexes that already hold the rest of the store, when
+                None every game in the store is indexed
+        """
+        for game in (new_games if new_games is not None else games.values()):
+            for players in GamesDB._player_range(game):
+                self._player_index[players].append_unsorted(game.duration, game.id)
+            self._complexity_index.append_unsorted(GamesDB._complexity_key(game), game.id)
+            name = GamesDB.normalize_name(game.name)
+            self._name_index[name] = game.id
+            self._trigram_index.add(game.id, name)
+        for bucket in self._player_index.values():
+            bucket.sort()
+        self._complexity_index.sort()
+
+        # Every game from the cut-off to the end of the complexity ranking is a hard game
+        for bucket in self._hard_index.values():
+            bucket.clear()
+        n = len(self._complexity_index)
+        if n:
+            start = n - max(1, n // 4)
+            self._hard_cutoff = self._complexity_index.keys[start]
+            for game_id in self._complexity_index.ids[start:]:
+                game = games[game_id]
+                for players in GamesDB._player_range(game):
+                    self._hard_index[players].append_unsorted(game.duration, game.id)
+            for bucket in self._hard_index.values():
+                bucket.sort()
+
+    def _index_game(self, game: Game):
+        """
+        Helper function to add a game to the player index under every number of players it supports, in duration order,
+        to the complexity ranking and to the name index, the game must already be in the games store
+
+        Args:
+            game: Game, game object that is being added to the indexes
+        """
+        for players in GamesDB._player_range(game):
+            self._player_index[players].add(game.duration, game.id)
+        name = GamesDB.normalize_name(game.name)
+        self._name_index[name] = game.id
+        self._trigram_index.add(game.id, name)
+
+        key = GamesDB._complexity_key(game)
+        self._complexity_index.add(key, game.id)
+        # A game that ranks above the current cut-off is hard, then the cut-off itself moves to account for it
+        if self._hard_cutoff is not None and key >= self._hard_cutoff:
+            self._add_hard_game(game)
+        self._update_hard_cutoff()
+
+    def _unindex_game(self, game: Game):
+        """
+        Helper function to remove a game from the player index, complexity ranking and name index, must be given the game
+        as it was indexed
+
+        Args:
+            game: Game, game object that is being removed from the indexes
+        """
+        for players in GamesDB._player_range(game):
+            self._player_index[players].remove(game.duration, game.id)
+        name = GamesDB.normalize_name(game.name)
+        del self._name_index[name]
+        self._trigram_index.remove(game.id, name)
+
+        key = GamesDB._complexity_key(game)
+        if key >= self._hard_cutoff:
+            self._remove_hard_game(game)
+        self._complexity_index.remove(key, game.id)
+        self._update_hard_cutoff()
+
+    def _add_hard_game(self, game: Game):
+        """
+        Helper function to add a game to the hard game index under every number of players it supports
+
+        Args:
+            game: Game, game object that has become one of the hard games
+        """
+        for players in GamesDB._player_range(game):
+            self._hard_index[players].add(game.duration, game.id)
+
+    def _remove_hard_game(self, game: Game):
+        """
+        Helper function to remove a game from the hard game index under every number of players it supports
+
+        Args:
+            game: Game, game object that is no longer one of the hard games
+        """
+        for players in GamesDB._player_range(game):
+            self._hard_index[players].remove(game.duration, game.id)
+
+    def _update_hard_cutoff(self):
+        """
+        Helper function to move the top 25% cut-off after a game is added to or removed from the complexity ranking.
+        Only the games between the old and new cut-off change whether they are hard, which is at most a couple of
+        games per insert or update, so the rest of the hard game index is left alone.
+        """
+        index = self._complexity_index
+        n = len(index)
+        new_cutoff = index.keys[n - max(1, n // 4)] if n else None
+        old_cutoff = self._hard_cutoff
+        if new_cutoff == old_cutoff:
+            return
+
+        # Positions in the ranking where the hard games start, before and after the change
+        old_start = index.bisect_left(old_cutoff) if old_cutoff is not None else n
+        new_start = index.bisect_left(new_cutoff) if new_cutoff is not None else n
+
+        # A lower cut-off promotes the games between the two starts, a higher one demotes them
+        for position in range(min(old_start, new_start), max(old_start, new_start)):
+            game = self.games[index.ids[position]]
+            if new_start < old_start:
+                self._add_hard_game(game)
+            else:
+                self._remove_hard_game(game)
+            if self._bags:
+                self._bag_patches.append(game.id)
+        self._hard_cutoff = new_cutoff
+
+    def _queue_write(self, write: Game | int):
+        """
+        Helper function to hold a write in memory until enough writes are waiting, or they have waited long enough, to
+        flush them to the database file together
+
+        Args:
+            write: Game | int, game object to write, or the ID of a game to delete
+        """
+        if not self._pending_writes:
+            self._pending_since = ticks_ms()
+        self._pending_writes.append(write)
+        if len(self._pending_writes) >= GamesDB._FLUSH_RECORDS:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        """
+        Flush the waiting writes if the oldest of them has waited long enough, meant to be called regularly while idle
+        """
+        if self._pending_writes and ticks_diff(ticks_ms(), self._pending_since) >= GamesDB._FLUSH_MS:
+            self.flush()
+
+    @metrics.timed('db.flush')
+    def flush(self):
+        """
+        Write every waiting write to the database file, txt records are appended with a single write
+        """
+        if not self._pending_writes:
+            return
+        writes = self._pending_writes
+        self._pending_writes = []
+
+        if self._binary_file:
+            for write in writes:
+                if isinstance(write, Game):
+                    self._binary_file.write_game(write)
+                else:
+                    self._binary_file.delete_game(write)
+        else:
+            self._append_record(''.join([f'{write}\n' if isinstance(write, Game) else f'{GamesDB._TOMBSTONE}{write}\n'
+                                         for write in writes]), len(writes), method='a')
+            self._compact_if_needed()
+
+    def _write_games(self, games: [Game]):
+        """
+        Helper function to persist many new games with a single write in whichever format the database file uses
+
+        Args:
+            games: [Game], new game objects being written, in ID order
+        """
+        # Anything waiting goes first so the records stay in the order they were made
+        self.flush()
+        if self._binary_file:
+            self._binary_file.append_games(games)
+        else:
+            self._append_record(''.join([f'{game}\n' for game in games]), len(games), method='a')
+
+    @txt_context_manager
+    def _append_record(self, record: str, record_count: int = 1, **kwargs):
         """
-        # Ensure file object is passed in with kwargs
+        Helper function to append record lines to the end of the database txt file
+
+        Args:
+            record: str, the record lines being appended, including the trailing newlines
+            record_count: int, default 1, number of record lines in the record string
+            kwargs: expects the file object from the context manager
+        """
+        # Ensure the file object is passed in the kwargs
         if 'file' in kwargs:
-            f = kwargs['file']
-            # Return the lines from the file
-            return f.readlines()
-        return []
+            kwargs['file'].write(record)
+            self._record_count += record_count
 
+    def _compact_if_needed(self):
+        """
+        Helper function to compact the database file once the share of dead records crosses the compaction ratio,
+        small files are never compacted since the extra records cost almost nothing, binary files are updated in place
+        and never need compacting
+        """
+        if self._binary_file:
+            return
+        dead_records = self._record_count - len(self.games)
+        if self._record_count >= GamesDB._COMPACTION_MIN_RECORDS and \
+                dead_records > self._record_count * GamesDB._COMPACTION_RATIO:
+            self.compact(method='w')
+
+    @metrics.timed('db.compact')
     @txt_context_manager
-    def _rewrite_file_lines(self, file_lines: [str], **kwargs):
+    def compact(self, **kwargs):
         """
-        Helper function to rewrite lines into the database txt file
+        Rewrite the database txt file with only the current record of each game, dropping replaced and deleted records
 
         Args:
-            file_lines: [str], list of lines that are going to be rewritten to the txt file
             kwargs: expects the file object from the context manager
         """
         # Ensure the file object is passed in the kwargs
         if 'file' in kwargs:
             f = kwargs['file']
-            # For each line, write it to the file
-            for line in file_lines:
-                f.write(line)
+            # Write each game one line at a time rather than building the whole file in memory
+            for game in self.games.values():
+                f.write(f'{game}\n')
+            self._record_count = len(self.games)
+            # The rewritten file already holds the result of any waiting writes
+            self._pending_writes = []
 
-    def get_random_game(self, players: int, duration: int = 0, complexity: bool = False) -> Game | None:
+    @metrics.timed('db.get_random_game')
+    def get_random_game(self, players: int, duration: int = 0, complexity: bool = False,
+                        mode: str = UNIFORM) -> Game | None:
         """
         Get a random game from the database given the provided parameters
 
@@ -180,56 +717,488 @@ class GamesDB:
             players: int, number of players
             duration: int, default 0, preferred duration of a game
             complexity: bool, default False, whether games should be filtered for difficulty
+            mode: str, default UNIFORM, UNIFORM to give every match the same chance, WEIGHTED to make recently picked
+                games less likely and favorites more likely, the pick is then recorded in the play history, SHUFFLE to
+                not repeat a game for the same parameters until every match has been picked
 
         Returns:
             Game, a single game object of the selected game based on the parameters
         """
-        _game_matches = []
-        # Set the source of games to the top 25% most difficult
-        if complexity:
-            games_src = self._get_hardest_games()
-        # Otherwise set it to the list of all games in records
+        # Find the slice of games that fit the number of players, duration and complexity parameters
+        bucket, lo, hi = self._match_window(players, duration, complexity)
+
+        # Every game in the window is a match, pick a random position inside it
+        if lo < hi:
+            if mode == GamesDB.WEIGHTED:
+                now = int(time.time())
+                game_id = bucket.ids[GamesDB._weighted_position(self._weights(bucket, now), lo, hi)]
+                self._record_pick(game_id, now)
+                return self.games[game_id]
+            if mode == GamesDB.SHUFFLE:
+                return self.games[self._shuffle_bag((players, duration, complexity), bucket, lo, hi).draw()]
+            return self.games[bucket.ids[random.randint(lo, hi - 1)]]
+
+        # Print to console error message and return None if there were no matches
+        print('Unfortunately, no games met the given criteria.')
+        return None
+
+    @metrics.timed('db.count_matches')
+    def count_matches(self, players: int, duration: int = 0, complexity: bool = False) -> int:
+        """
+        Count the games that match the given parameters, without picking one
+
+        Args:
+            players: int, number of players
+            duration: int, default 0, preferred duration of a game
+            complexity: bool, default False, whether games should be filtered for difficulty
+
+        Returns:
+            int: number of games that get_random_game would pick from
+        """
+        _, lo, hi = self._match_window(players, duration, complexity)
+        return hi - lo
+
+    def iter_games(self, offset: int = 0, limit: int = None, players: int = 0, max_duration: int = 0):
+        """
+        Generator of one page of games, only the games on the page are read so the library is never copied. Given a
+        number of players, the games come from the same duration sorted player index get_random_game picks from, in
+        duration order, otherwise every game is listed in ID order.
+
+        Args:
+            offset: int, default 0, number of matching games skipped before the page
+            limit: int, default None, most games on the page, None for every game after the offset
+            players: int, default 0, number of players the games must support, 0 for any
+            max_duration: int, default 0, longest duration of a game, 0 for any
+
+        Returns:
+            generator of Game, the games on the page
+        """
+        if players:
+            bucket, lo, hi = self._match_window(players)
+            if max_duration > 0:
+                hi = min(hi, bucket.bisect_right(max_duration))
+            end = hi if limit is None else min(hi, lo + offset + limit)
+            # The IDs are read from the index as it was when the listing started, games deleted since are skipped
+            ids = bucket.ids
+            for position in range(lo + offset, min(end, len(ids))):
+                game = self.games.get(ids[position])
+                if game is not None:
+                    yield game
+            return
+
+        skipped = 0
+        listed = 0
+        for game_id in self.games.keys():
+            if limit is not None and listed == limit:
+                return
+            # Without a duration filter every game matches, so the offset is skipped without reading the games
+            if max_duration <= 0 and skipped < offset:
+                skipped += 1
+                continue
+            game = self.games.get(game_id)
+            if game is None or (0 < max_duration < game.duration):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            listed += 1
+            yield game
+
+    @metrics.timed('db.get_random_games')
+    def get_random_games(self, k: int, players: int, duration: int = 0, complexity: bool = False,
+                         mode: str = UNIFORM) -> [Game]:
+        """
+        Get up to k different random games from the database given the provided parameters, from the same matches as
+        get_random_game. Only the k picks are drawn, the matches are never copied or shuffled as a whole.
+
+        Args:
+            k: int, most games to pick
+            players: int, number of players
+            duration: int, default 0, preferred duration of a game
+            complexity: bool, default False, whether games should be filtered for difficulty
+            mode: str, default UNIFORM, UNIFORM to give every match the same chance, WEIGHTED to weight them by play
+                history and favorites, the picks are only a shortlist so they aren't recorded in the play history
+
+        Returns:
+            [Game]: the picked games in random order, fewer than k if there aren't enough matches
+        """
+        bucket, lo, hi = self._match_window(players, duration, complexity)
+        k = min(k, hi - lo)
+        positions = []
+
+        if mode == GamesDB.WEIGHTED and k:
+            # Each pick's weight is taken out of the tree so it can't be drawn again, then put back afterwards
+            tree = self._weights(bucket, int(time.time()))
+            weights = []
+            for _ in range(k):
+                position = GamesDB._weighted_position(tree, lo, hi)
+                positions.append(position)
+                weights.append(tree.weight(position))
+                tree.add(position, -weights[-1])
+            for position, weight in zip(positions, weights):
+                tree.add(position, weight)
         else:
-            games_src = [value for key, value in self.games.items()]
-
-        # For each game in the source, move it to the matches pool if it fits with the duration parameter
-        for value in games_src:
-            # If a duration value greater than 0 is provided, calculate how close a game is to the desired length
-            if duration > 0:
-                # This is just an arbitrary value saying look for games that are +/- 20 mins from given duration
-                # Expand the time allowance if complex games are being used
-                time_allowance = 20 if not complex else 30
-                time_diff = abs(duration - value.duration)
-                # If the time difference is within time allowance and players parameter fits, add to matches pool
-                if time_diff <= time_allowance and value.min_players <= players <= value.max_players:
-                    _game_matches.append(value)
-            # If duration was left at 0, only check if numbers of players are a match and add to matches pool
+            # Floyd's algorithm picks k distinct offsets into the window with exactly k random draws
+            chosen = set()
+            for end in range(hi - lo - k, hi - lo):
+                offset = random.randint(0, end)
+                if offset in chosen:
+                    offset = end
+                chosen.add(offset)
+                positions.append(lo + offset)
+            # Floyd's picks are a fair sample but not in a fair order, shuffle the few of them
+            for index in range(len(positions) - 1, 0, -1):
+                other = random.randint(0, index)
+                positions[index], positions[other] = positions[other], positions[index]
+
+        return [self.games[bucket.ids[position]] for position in positions]
+
+    @metrics.timed('db.rank_games')
+    def rank_games(self, k: int, players: int, duration: int = 0, complexity: bool = False) -> [Game]:
+        """
+        Get the k games whose duration is closest to the given duration, from the same matches as get_random_game. The
+        matches are already sorted by duration, so the closest are found by walking outward from the given duration
+        instead of sorting them.
+
+        Args:
+            k: int, most games to return
+            players: int, number of players
+            duration: int, default 0, preferred duration of a game, when 0 the shortest games come first
+            complexity: bool, default False, whether games should be filtered for difficulty
+
+        Returns:
+            [Game]: up to k games, closest duration first
+        """
+        bucket, lo, hi = self._match_window(players, duration, complexity)
+        games = []
+        for position in GamesDB._closest_positions(bucket, duration, lo, hi):
+            if len(games) == k:
+                break
+            games.append(self.games[bucket.ids[position]])
+        return games
+
+    def set_favorite(self, game_id: int, boost: int) -> int:
+        """
+        Set how much more often a game comes up in weighted picks
+
+        Args:
+            game_id: int, ID of the game
+            boost: int, weight multiplier from 1, not a favorite, to PlayHistory.MAX_BOOST
+
+        Returns:
+            int: value representing whether the boost was set
+        """
+        if game_id not in self.games:
+            return 404  # Error, could not find the game based on ID
+
+        self.history.set_favorite(game_id, boost)
+        # Favorites are rare, rebuilding the weights on the next weighted pick is simpler than finding every position
+        self._invalidate_weights()
+        return 201  # Successfully set the boost
+
+    def _weights(self, bucket: SortedIndex, now: int) -> FenwickTree:
+        """
+        Helper function to get the Fenwick tree of the play history weight of every game in a duration index. The index
+        keeps the tree between draws, a pick updates the picked game's weight straight away and the weights of the games
+        still recovering from earlier picks are only brought up to date every _WEIGHT_REFRESH_SECONDS.
+
+        Args:
+            bucket: SortedIndex, duration sorted index of the games
+            now: int, current time in seconds
+
+        Returns:
+            FenwickTree: the weights, lined up with the positions in the index
+        """
+        # Games that fully recovered since the last draw are forgotten, their weights have to be reset everywhere
+        if self.history.prune(now):
+            self._invalidate_weights()
+
+        tree = bucket.weights
+        if tree is None:
+            # Built once per change to the index, the weights of every game are needed only here
+            tree = bucket.weights = FenwickTree([self.history.weight(game_id, now) for game_id in bucket.ids])
+            bucket.weights_time = now
+        elif not 0 <= now - bucket.weights_time < GamesDB._WEIGHT_REFRESH_SECONDS:
+            # Bring the recovering games up to date, every other game is already at its base weight
+            for game_id in self.history.recent:
+                game = self.games.get(game_id)
+                if game is not None:
+                    GamesDB._set_weight(bucket, game, self.history.weight(game_id, now))
+            bucket.weights_time = now
+        return tree
+
+    def _record_pick(self, game_id: int, now: int):
+        """
+        Helper function to record a pick in the play history and drop the game's weight in every weight tree it is in,
+        instead of waiting for the trees' next refresh
+
+        Args:
+            game_id: int, ID of the picked game
+            now: int, current time in seconds
+        """
+        self.history.record_pick(game_id, now)
+        game = self.games[game_id]
+        weight = self.history.weight(game_id, now)
+        for players in GamesDB._player_range(game):
+            GamesDB._set_weight(self._player_index[players], game, weight)
+            GamesDB._set_weight(self._hard_index[players], game, weight)
+
+    @staticmethod
+    def _set_weight(bucket: SortedIndex, game: Game, weight: int):
+        """
+        Helper function to set a game's weight in the weight tree of a duration index, if the index has a tree and holds
+        the game
+
+        Args:
+            bucket: SortedIndex, duration sorted index
+            game: Game, game object whose weight is changing
+            weight: int, the new weight
+        """
+        if bucket.weights is None:
+            return
+        position = bucket.find(game.duration, game.id)
+        if position >= 0:
+            bucket.weights.add(position, weight - bucket.weights.weight(position))
+
+    @staticmethod
+    def _weighted_position(tree: FenwickTree, lo: int, hi: int) -> int:
+        """
+        Helper function to draw a position from a window of a duration index with each game's chance in proportion to
+        its weight, in O(log n)
+
+        Args:
+            tree: FenwickTree, weights of the games in the index
+            lo: int, start position of the window
+            hi: int, exclusive end position of the window, the window must hold some weight
+
+        Returns:
+            int: the drawn position
+        """
+        # Pick a point in the window's share of the running total and find the game whose weight it falls in
+        start = tree.prefix_sum(lo)
+        return tree.find(start + random.randint(0, tree.prefix_sum(hi) - start - 1))
+
+    def _shuffle_bag(self, query: (int, int, bool), bucket: SortedIndex, lo: int, hi: int) -> ShuffleBag:
+        """
+        Helper function to get the shuffle bag for a query, refilled from its window once every match has been drawn
+
+        Args:
+            query: (int, int, bool), the players, duration and complexity parameters of the query
+            bucket: SortedIndex, duration sorted index the query's window is in
+            lo: int, start position of the window
+            hi: int, exclusive end position of the window, the window must not be empty
+
+        Returns:
+            ShuffleBag: bag with at least one ID left to draw
+        """
+        # Taking the bag out and putting it back marks it as the most recently used
+        bag = self._bags.pop(query, None)
+        if bag is None:
+            bag = ShuffleBag()
+        if not bag:
+            bag.refill(bucket.ids[lo:hi])
+        self._bags[query] = bag
+        if len(self._bags) > GamesDB._BAG_LIMIT:
+            del self._bags[next(iter(self._bags))]
+        return bag
+
+    def _patch_bags(self, game_ids: [int]):
+        """
+        Helper function to bring every shuffle bag up to date after games changed, along with any games that became or
+        stopped being hard games. A game now in a bag's window joins its undrawn IDs unless it was already drawn, a game
+        no longer in the window leaves the bag.
+
+        Args:
+            game_ids: [int], IDs of the games that were inserted, updated or deleted
+        """
+        game_ids = game_ids + self._bag_patches
+        self._bag_patches = []
+        for query, bag in self._bags.items():
+            bucket, lo, hi = self._match_window(*query)
+            for game_id in game_ids:
+                game = self.games.get(game_id)
+                position = bucket.find(game.duration, game_id) if game else -1
+                if lo <= position < hi:
+                    bag.add(game_id)
+                else:
+                    bag.discard(game_id)
+
+    def _invalidate_weights(self):
+        """
+        Helper function to drop the weight trees of every duration index so they are rebuilt on their next weighted pick
+        """
+        for buckets in (self._player_index, self._hard_index):
+            for bucket in buckets.values():
+                bucket.weights = None
+
+    @metrics.timed('db.get_nearest_games')
+    def get_nearest_games(self, players: int, duration: int = 0, complexity: bool = False,
+                          k: int = 1) -> [(Game, (str,))]:
+        """
+        Get the games closest to the given parameters, meant for when no game matches them exactly. Closeness is the
+        minutes a game's duration is outside the time allowance, plus a distance for each player it is outside its range
+        and for how far its complexity is below the hard games.
+
+        Rather than scoring every game, the duration indexes are walked outward from the requested duration, starting
+        with the index for the requested number of players and widening to one more player either side at a time, and
+        the search stops once nothing further out can beat the k closest games found so far.
+
+        Args:
+            players: int, number of players
+            duration: int, default 0, preferred duration of a game
+            complexity: bool, default False, whether games should be filtered for difficulty
+            k: int, default 1, most games to return
+
+        Returns:
+            [(Game, (str,))]: up to k games, closest first, each with the constraints it relaxes out of RELAXED_PLAYERS,
+            RELAXED_DURATION and RELAXED_COMPLEXITY, an empty tuple if it is an exact match
+        """
+        # Closest games so far as (distance, ID), sorted and never longer than k
+        nearest = []
+        seen = set()
+        for player_gap in range(max(players - 1, GamesDB.MAX_PLAYERS - players) + 1):
+            # Every game not seen yet is at least this many players away
+            if len(nearest) == k and player_gap * GamesDB._PLAYER_DISTANCE >= nearest[-1][0]:
+                break
+            for bucket_players in ((players,) if not player_gap else (players - player_gap, players + player_gap)):
+                if not 1 <= bucket_players <= GamesDB.MAX_PLAYERS:
+                    continue
+                # The hard games come first when they are wanted, they give a close bound to stop the full index early
+                buckets = (self._hard_index[bucket_players], self._player_index[bucket_players]) if complexity else \
+                    (self._player_index[bucket_players],)
+                for bucket in buckets:
+                    self._scan_nearest(bucket, players, duration, complexity, player_gap, k, nearest, seen)
+
+        return [(self.games[game_id], self._nearest_distance(self.games[game_id], players, duration, complexity)[1])
+                for _, game_id in nearest]
+
+    def _scan_nearest(self, bucket: SortedIndex, players: int, duration: int, complexity: bool, player_gap: int, k: int,
+                      nearest: [(int, int)], seen: set):
+        """
+        Helper function to walk a duration index outward from the requested duration, closest duration first, adding
+        any game closer than the k closest so far
+
+        Args:
+            bucket: SortedIndex, duration sorted index being walked
+            players: int, number of players
+            duration: int, preferred duration of a game, 0 matches every duration
+            complexity: bool, whether games should be filtered for difficulty
+            player_gap: int, how many players the index is from the requested number of players
+            k: int, most games to keep
+            nearest: [(int, int)], closest games so far as (distance, ID), updated in place
+            seen: set, IDs of the games already scored, updated in place
+        """
+        time_allowance = GamesDB.COMPLEX_TIME_ALLOWANCE if complexity else GamesDB.TIME_ALLOWANCE
+        for position in GamesDB._closest_positions(bucket, duration, 0, len(bucket)):
+            # The durations only get further away along the walk
+            excess = max(0, abs(bucket.keys[position] - duration) - time_allowance) if duration > 0 else 0
+
+            # Nothing further along the walk can be closer than the k closest games found so far
+            if len(nearest) == k and excess + player_gap * GamesDB._PLAYER_DISTANCE >= nearest[-1][0]:
+                return
+
+            game_id = bucket.ids[position]
+            if game_id in seen:
+                continue
+            seen.add(game_id)
+            distance = self._nearest_distance(self.games[game_id], players, duration, complexity)[0]
+            if len(nearest) < k or distance < nearest[-1][0]:
+                # k is small, a sorted insert into the short list is cheaper than keeping a heap
+                entry = (distance, game_id)
+                index = len(nearest)
+                while index and nearest[index - 1] > entry:
+                    index -= 1
+                nearest.insert(index, entry)
+                if len(nearest) > k:
+                    nearest.pop()
+
+    @staticmethod
+    def _closest_positions(bucket: SortedIndex, duration: int, lo: int, hi: int):
+        """
+        Helper generator of the positions in a window of a duration index, closest duration to the given one first
+
+        Args:
+            bucket: SortedIndex, duration sorted index being walked
+            duration: int, duration to walk outward from, 0 walks from the shortest game up
+            lo: int, start position of the window
+            hi: int, exclusive end position of the window
+
+        Returns:
+            generator of int, every position in the window
+        """
+        keys = bucket.keys
+        right = min(max(bucket.bisect_left(duration), lo), hi)
+        left = right - 1
+        while left >= lo or right < hi:
+            # Take whichever side is closer to the duration so the durations only get further away
+            if right < hi and (left < lo or keys[right] - duration <= duration - keys[left]):
+                yield right
+                right += 1
             else:
-                if value.min_players <= players <= value.max_players:
-                    _game_matches.append(value)
-
-        # If there are games in the matches pool
-        if _game_matches:
-            # Return a game randomly within the matches pool
-            return _game_matches[random.randint(0, len(_game_matches) - 1)]
-        # Otherwise print to console error message and return None
-        else:
-            print('Unfortunately, no games met the given criteria.')
-            return None
+                yield left
+                left -= 1
 
-    def _get_hardest_games(self) -> [Game]:
+    def _nearest_distance(self, game: Game, players: int, duration: int, complexity: bool) -> (int, (str,)):
         """
-        Helper function to return a pool of only the top 25% most difficult games from all records
+        Helper function for how far a game is from the given parameters and which of them it relaxes
+
+        Args:
+            game: Game, game object being measured
+            players: int, number of players
+            duration: int, preferred duration of a game, 0 matches every duration
+            complexity: bool, whether games should be filtered for difficulty
 
         Returns:
-            [Game]: list of game objects that represent the top 25% most difficult
+            (int, (str,)): distance of the game and the constraints it relaxes
+        """
+        distance = 0
+        relaxed = ()
+
+        player_gap = max(game.min_players - players, players - min(game.max_players, GamesDB.MAX_PLAYERS), 0)
+        if player_gap:
+            distance += player_gap * GamesDB._PLAYER_DISTANCE
+            relaxed += (GamesDB.RELAXED_PLAYERS,)
+
+        if duration > 0:
+            time_allowance = GamesDB.COMPLEX_TIME_ALLOWANCE if complexity else GamesDB.TIME_ALLOWANCE
+            excess = abs(game.duration - duration) - time_allowance
+            if excess > 0:
+                distance += excess
+                relaxed += (GamesDB.RELAXED_DURATION,)
+
+        key = GamesDB._complexity_key(game)
+        if complexity and key < self._hard_cutoff:
+            # Hundredths of complexity below the easiest hard game, always at least 1 so the game ranks behind a hard one
+            below = self._hard_cutoff // GamesDB._RANK_ID_SPAN - key // GamesDB._RANK_ID_SPAN
+            distance += max(1, below * GamesDB._COMPLEXITY_DISTANCE // 100)
+            relaxed += (GamesDB.RELAXED_COMPLEXITY,)
+        return distance, relaxed
+
+    def _match_window(self, players: int, duration: int = 0, complexity: bool = False) -> (SortedIndex, int, int):
         """
-        # Sort all the games by their complexity in a reverse order with highest at the front
-        sorted_items = sorted([value for key, value in self.games.items()], key=lambda g: g.complexity, reverse=True)
+        Helper function to find the slice of the player index that fits the given number of players and duration, or of
+        the hard game index when complex games are wanted
 
-        # Calculate what the n value for top 25% of all games is
-        top_n = max(1, len(sorted_items) // 4)
+        Args:
+            players: int, number of players
+            duration: int, default 0, preferred duration of a game, 0 matches every duration
+            complexity: bool, default False, whether only the top 25% most difficult games are wanted, this also widens
+                the time allowance
+
+        Returns:
+            (SortedIndex, int, int): the duration sorted index for the number of players and the start and exclusive
+            end positions of the matching games within it
+        """
+        # A number of players outside the rotary switch range has no index and therefore no matches
+        bucket = (self._hard_index if complexity else self._player_index).get(players)
+        if bucket is None:
+            return SortedIndex(), 0, 0
 
-        # Return upto the n value for top 25% of games
-        return sorted_items[:top_n]
+        # If a duration value greater than 0 is provided, find the games within the time allowance of it
+        if duration > 0:
+            time_allowance = GamesDB.COMPLEX_TIME_ALLOWANCE if complexity else GamesDB.TIME_ALLOWANCE
+            lo, hi = bucket.window(duration - time_allowance, duration + time_allowance)
+            return bucket, lo, hi
 
+        # If duration was left at 0, every game for the number of players is a match
+        return bucket, 0, len(bucket)
@@ -1,3 +1,4 @@
+from csv_import import read_csv_games
 from games_db import GamesDB
 from game import Game
 
@@ -22,6 +23,46 @@ class DBWrapper:
         # For every value in the database dictionary, return list comprehension of all the values
         return [value for key, value in self.db.games.items()]
 
+    def get_game_by_name(self, name: str) -> Game | None:
+        """
+        Wrapper function for looking up a game in the database by its name
+
+        Args:
+            name: str, name of the game, case, spacing and URL encoded spaces are ignored
+
+        Returns:
+            Game | None: the game with that name or None if there isn't one
+        """
+        return self.db.get_game_by_name(name)
+
+    def search_games(self, query: str, k: int = 10) -> [Game]:
+        """
+        Wrapper function for searching for games by name, tolerating typos
+
+        Args:
+            query: str, the search
+            k: int, most games to return
+
+        Returns:
+            [Game]: up to k games, best match first
+        """
+        return self.db.search_games(query, k)
+
+    def iter_games(self, offset: int = 0, limit: int = None, players: int = 0, max_duration: int = 0):
+        """
+        Wrapper function for listing one page of games without copying the library
+
+        Args:
+            offset: int, default 0, number of matching games skipped before the page
+            limit: int, default None, most games on the page, None for every game after the offset
+            players: int, default 0, number of players the games must support, 0 for any
+            max_duration: int, default 0, longest duration of a game, 0 for any
+
+        Returns:
+            generator of Game, the games on the page
+        """
+        return self.db.iter_games(offset, limit, players, max_duration)
+
     def insert_game(self, game: Game):
         """
         Wrapper function for inserting a game into the database
@@ -29,8 +70,48 @@ class DBWrapper:
         Args:
             game: Game, provided game object that is to be inserted into the database
         """
-        # Insert the game using the 'a' (append) method for writing to the txt file
-        return self.db.insert_game(game=game, method='a')
+        return self.db.insert_game(game=game)
+
+    def import_games(self, lines) -> (int, int, int):
+        """
+        Wrapper function for importing many games into the database from a CSV file, either in this project's column
+        names or a BoardGameGeek collection export
+
+        Args:
+            lines: iterable of the lines of the CSV file as strings, such as an open file
+
+        Returns:
+            (int, int, int): number of games imported, skipped as duplicates and skipped as invalid
+        """
+        return self.db.import_games(read_csv_games(lines))
+
+    def import_batches(self, lines, batch_size: int):
+        """
+        Wrapper function for importing a CSV file a batch of games at a time, so the caller can get on with other work
+        between batches instead of waiting for the whole file
+
+        Args:
+            lines: iterable of the lines of the CSV file as strings, such as an open file
+            batch_size: int, number of rows imported in each batch
+
+        Returns:
+            generator of (int, int, int), running totals of games imported, skipped as duplicates and skipped as invalid
+                after each batch
+        """
+        games = read_csv_games(lines)
+        totals = (0, 0, 0)
+        while True:
+            batch = []
+            # Breaking out of the loop leaves the rest of the rows in the generator for the next batch
+            for game in games:
+                batch.append(game)
+                if len(batch) == batch_size:
+                    break
+            if not batch:
+                return
+            counts = self.db.import_games(batch)
+            totals = tuple(total + count for total, count in zip(totals, counts))
+            yield totals
 
     def update_game(self, game: Game):
         """
@@ -41,7 +122,103 @@ class DBWrapper:
         """
         return self.db.update_game(game=game)
 
-    def get_random_game(self, players: int, duration: int=0, complexity: bool=False) -> Game:
+    def delete_game(self, game_id: int):
+        """
+        Wrapper function for deleting a game that is currently in the database
+
+        Args:
+            game_id: int, ID of the game that is to be deleted from the database
+        """
+        return self.db.delete_game(game_id=game_id)
+
+    def count_matches(self, players: int, duration: int = 0, complexity: bool = False) -> int:
+        """
+        Count the games in the database that match the provided criteria
+
+        Args:
+            players: int, number of players
+            duration: int, preferred duration of game
+            complexity: bool, whether the games should be filtered for the top 25% difficulty
+
+        Returns:
+            int: number of games get_random_game would pick from
+        """
+        return self.db.count_matches(players, duration, complexity)
+
+    def get_random_games(self, k: int, players: int, duration: int = 0, complexity: bool = False,
+                         mode: str = GamesDB.UNIFORM) -> [Game]:
+        """
+        Get up to k different random games from the database that match with the provided criteria
+
+        Args:
+            k: int, most games to pick
+            players: int, number of players
+            duration: int, preferred duration of game
+            complexity: bool, whether the games should be filtered for the top 25% difficulty
+            mode: str, GamesDB.UNIFORM or GamesDB.WEIGHTED to weight the picks by play history and favorites
+
+        Returns:
+            [Game]: the picked games, fewer than k if there aren't enough matches
+        """
+        return self.db.get_random_games(k, players, duration, complexity, mode)
+
+    def rank_games(self, k: int, players: int, duration: int = 0, complexity: bool = False) -> [Game]:
+        """
+        Get the k games that match with the provided criteria and are closest to the preferred duration
+
+        Args:
+            k: int, most games to return
+            players: int, number of players
+            duration: int, preferred duration of game
+            complexity: bool, whether the games should be filtered for the top 25% difficulty
+
+        Returns:
+            [Game]: up to k games, closest duration first
+        """
+        return self.db.rank_games(k, players, duration, complexity)
+
+    def get_nearest_games(self, players: int, duration: int = 0, complexity: bool = False, k: int = 1) -> [(Game, (str,))]:
+        """
+        Wrapper function for getting the games closest to the provided criteria, for when no game matches them exactly
+
+        Args:
+            players: int, number of players
+            duration: int, preferred duration of game
+            complexity: bool, whether the games should be filtered for the top 25% difficulty
+            k: int, most games to return
+
+        Returns:
+            [(Game, (str,))]: closest games first, each with the names of the criteria it doesn't meet
+        """
+        return self.db.get_nearest_games(players, duration, complexity, k)
+
+    def flush(self):
+        """
+        Wrapper function for writing any inserts, updates and deletes still held in memory to the database file
+        """
+        self.db.flush()
+
+    def flush_if_due(self):
+        """
+        Wrapper function for writing the inserts, updates and deletes held in memory if they have waited long enough
+        """
+        self.db.flush_if_due()
+
+    def set_favorite(self, game_id: int, boost: int) -> int:
+        """
+        Wrapper function for setting how much more often a game comes up in weighted picks
+
+        Args:
+            game_id: int, ID of the game
+            boost: int, weight multiplier, 1 to stop the game being a favorite
+
+        Returns:
+            int: value representing whether the boost was set
+        """
+        return self.db.set_favorite(game_id=game_id, boost=boost)
+
+    def get_random_game(self, players: int, duration: int=0, complexity: bool=False,
+                        mode: str=GamesDB.UNIFORM) -> Game:
         """
         Get a random game from the database that matches with the provided criteria
 
@@ -49,9 +226,11 @@ class DBWrapper:
             players: int, number of players
             duration: int, preferred duration of game
             complexity: bool, whether the games should be filtered for the top 25% difficulty
+            mode: str, GamesDB.UNIFORM, GamesDB.WEIGHTED to weight the pick by play history and favorites, or
+                GamesDB.SHUFFLE to not repeat a game until every match has been picked
 
         Returns:
             Game: a single game object that matched the given criteria
         """
-        return self.db.get_random_game(players, duration, complexity)
+        return self.db.get_random_game(players, duration, complexity, mode)
 
@@ -0,0 +1,210 @@
+import json
+
+
+def url_decode(value: str, plus: bool = True) -> str:
+    """
+    Decode a URL encoded value, MicroPython has no urllib. Every %XX escape is decoded as a byte, so characters encoded
+    as several UTF-8 bytes come back whole.
+
+    Args:
+        value: str, the encoded value
+        plus: bool, default True, whether + stands for a space, as it does in query strings and form bodies but not
+            in paths
+
+    Returns:
+        str: the decoded value
+    """
+    encoded = (value.replace('+', ' ') if plus else value).encode()
+    decoded = bytearray()
+    position = 0
+    while position < len(encoded):
+        # A % followed by two hex digits is a single encoded byte, anything else is kept as it is
+        if encoded[position] == ord('%') and position + 3 <= len(encoded):
+            try:
+                decoded.append(int(encoded[position + 1:position + 3].decode(), 16))
+                position += 3
+                continue
+            except ValueError:
+                pass
+        decoded.append(encoded[position])
+        position += 1
+    return decoded.decode()
+
+
+def parse_query(text: str) -> {str: str}:
+    """
+    Decode a query string or form encoded body into its fields
+
+    Args:
+        text: str, the fields, name=value pairs separated by &
+
+    Returns:
+        {str: str}: value of each field, the last one wins when a name is repeated
+    """
+    fields = {}
+    for pair in text.split('&'):
+        if pair:
+            name, _, value = pair.partition('=')
+            fields[url_decode(name)] = url_decode(value)
+    return fields
+
+
+class HttpRequest:
+    def __init__(self, method: str, target: str, version: str, headers: {str: str}):
+        """
+        The request line and headers of a request, the body is only read into it when a handler asks for it
+
+        Args:
+            method: str, request method, like GET or POST
+            target: str, request target, the path and query string as sent
+            version: str, HTTP version, like HTTP/1.1
+            headers: {str: str}, headers with lower case names
+        """
+        self.method = method
+        self.version = version
+        self.headers = headers
+        # The path is kept encoded so an encoded / inside a path segment doesn't split it
+        self.path, _, query = target.partition('?')
+        self.query = parse_query(query)
+        self.content_length = int(headers.get('content-length', 0))
+        self.body = b''
+        # Whether the connection stays open for another request after this one, the default from HTTP/1.1 on, a handler
+        # clears it when its response can't be followed by another
+        self.keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+    def segments(self) -> [str]:
+        """
+        Decoded segments of the path, /game/Ticket%20to%20Ride/2 gives ['game', 'Ticket to Ride', '2']
+
+        Returns:
+            [str]: the segments after the leading /
+        """
+        return [url_decode(segment, plus=False) for segment in self.path.split('/')[1:]]
+
+    def fields(self) -> dict:
+        """
+        Decode the body, which must already be read, as JSON or as a form, picked by its Content-Type
+
+        Returns:
+            dict: value of each field of the body
+
+        Raises:
+            ValueError: if the body is not a JSON object or can't be decoded
+        """
+        content_type = self.headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type == 'application/json':
+            fields = json.loads(self.body)
+            if not isinstance(fields, dict):
+                raise ValueError('Expected a JSON object')
+            return fields
+        return parse_query(self.body.decode())
+
+
+class HttpParser:
+    # Bytes of the buffer each connection reads requests into, the head of a request and any body a handler reads
+    # whole must fit in it
+    BUFFER_SIZE = 2048
+
+    def __init__(self):
+        """
+        Incremental HTTP/1.1 request parser working in place on a buffer allocated once. Bytes are received straight
+        into the free end of the buffer and parsed once a request's head is complete, whatever follows the head, its
+        body or the next request on a kept alive connection, stays in the buffer until it is taken.
+        """
+        self.buffer = bytearray(HttpParser.BUFFER_SIZE)
+        self._view = memoryview(self.buffer)
+        # Received bytes not yet parsed or taken are buffer[start:end]
+        self.start = 0
+        self.end = 0
+        # Bytes of the current request's body that haven't been taken yet, whether buffered or still to be received
+        self.body_remaining = 0
+
+    def reset(self):
+        """
+        Forget everything received, ready for a new connection
+        """
+        self.start = 0
+        self.end = 0
+        self.body_remaining = 0
+
+    def space(self) -> memoryview:
+        """
+        Free end of the buffer to receive more bytes into, the unparsed bytes are first moved to the front
+
+        Returns:
+            memoryview: the free part of the buffer, empty when the buffer is full
+        """
+        if self.start:
+            pending = self.end - self.start
+            if pending:
+                # Copied out first since the two ranges can overlap, usually nothing is pending and nothing is copied
+                self.buffer[:pending] = bytes(self._view[self.start:self.end])
+            self.start = 0
+            self.end = pending
+        return self._view[self.end:]
+
+    def received(self, count: int):
+        """
+        Account for bytes received into the space from the last call of space
+
+        Args:
+            count: int, number of bytes received
+        """
+        self.end += count
+
+    def buffered(self) -> int:
+        """
+        Number of received bytes not yet parsed or taken
+        """
+        return self.end - self.start
+
+    def parse_head(self) -> HttpRequest | None:
+        """
+        Parse the next request's line and headers if all of them have been received, its body is left to be taken
+
+        Returns:
+            HttpRequest | None: the request or None if more bytes are needed first
+
+        Raises:
+            ValueError: if the request is malformed or its head doesn't fit in the buffer
+        """
+        # MicroPython's bytearray has no find, so the pending bytes are copied out to search them
+        head_end = bytes(self._view[self.start:self.end]).find(b'\r\n\r\n')
+        if head_end == -1:
+            if self.buffered() == len(self.buffer):
+                raise ValueError('Request head is too large')
+            return None
+
+        lines = str(self._view[self.start:self.start + head_end], 'utf-8').split('\r\n')
+        self.start += head_end + 4
+        try:
+            method, target, version = lines[0].split()
+        except ValueError:
+            raise ValueError('Malformed request line')
+        headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(':')
+            if not separator:
+                raise ValueError('Malformed header')
+            headers[name.strip().lower()] = value.strip()
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            raise ValueError('Chunked request bodies are not supported')
+
+        request = HttpRequest(method, target, version, headers)
+        if request.content_length < 0:
+            raise ValueError('Negative Content-Length')
+        self.body_remaining = request.content_length
+        return request
+
+    def take(self) -> memoryview:
+        """
+        Take the buffered part of the current request's body, the view is only valid until more bytes are received
+
+        Returns:
+            memoryview: up to the rest of the body, empty if none of it is buffered
+        """
+        count = min(self.body_remaining, self.buffered())
+        body = self._view[self.start:self.start + count]
+        self.start += count
+        self.body_remaining -= count
+        return body
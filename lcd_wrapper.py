@@ -3,6 +3,9 @@ from pico_i2c_lcd import I2cLcd
 
 
 class LCDWrapper:
+    # Short labels for the criteria a closest match relaxes, all three fit on the 16 character bottom line
+    RELAXED_LABELS = {'players': 'ply', 'duration': 'time', 'complexity': 'hard'}
+
     def __init__(self):
         # Set the I2C Address hex value
         I2C_ADDR = 0x27
@@ -21,12 +24,13 @@ class LCDWrapper:
         """
         self.lcd.clear()
 
-    def display_duration(self, counter: int = 0):
+    def display_duration(self, counter: int = 0, matches: int | None = None):
         """
         Clear LCD and replace with the Duration Display
 
         Args:
             counter: int, initial value to set with duration display
+            matches: int | None, default None, number of games matching the duration, not shown if None
         """
         # Clear display
         self.clear()
@@ -34,46 +38,81 @@ class LCDWrapper:
         # Move to top left corner and write duration message
         self.lcd.move_to(0, 0)
         self.lcd.putstr(f'Duration (mins):')
-        # self._write_centered(counter, 1)
-        self.lcd.move_to((16 - len(str(counter))) // 2, 1)
-        self.lcd.putstr(f'{counter}  ')
+        self.update_duration(counter, matches)
 
-    def update_duration(self, counter: int):
+    def update_duration(self, counter: int, matches: int | None = None):
         """
         Update the duration display with the new duration value
 
         Args:
             counter: int, new duration value to display
+            matches: int | None, default None, number of games matching the duration, not shown if None
         """
-        # TODO: there is no _write_centered function, needs to be created or removed
-        counter_str = f'{" " if len(str(counter)) == 2 else ""}{counter}'
-        self._write_centered(counter_str, 1)
-        self.lcd.move_to((16 - len(counter_str)) // 2, 1)
-        self.lcd.putstr(counter_str)
+        # Without a match count the duration is centered, otherwise it sits on the left with the count on the right
+        if matches is None:
+            padding = (16 - len(str(counter))) // 2
+            line = f'{" " * padding}{counter}'
+        else:
+            duration_str = f'{counter} min'
+            matches_str = f'{matches} match'
+            line = f'{duration_str}{" " * (16 - len(duration_str) - len(matches_str))}{matches_str}'
 
-    def display_game(self, game):
+        # Write the whole line so nothing is left over from a longer previous value
+        self.lcd.move_to(0, 1)
+        self.lcd.putstr(f'{line}{" " * (16 - len(line))}')
+
+    def display_game(self, game, relaxed: tuple = ()):
         """
         Given a game object, update LCD with the name of the game
 
         Args:
              game: Game, provided game object that will be displayed on LCD
+             relaxed: tuple, default (), names of the criteria the game doesn't meet when it is only the closest match,
+                shown on the bottom line
         """
         self.clear()
         if game:
             name = game.name
-            # If the length of the game name is larger than 16, display name wrapped to next line
-            if len(name) > 16:
+            # If the length of the game name is larger than 16, display name wrapped to next line, unless the bottom
+            # line is needed for the relaxed criteria, then the name is cut to the top line
+            if len(name) > 16 and not relaxed:
                 self.lcd.putstr(name)
             # Else, center the name on the top line
             else:
+                name = name[:16]
                 self.lcd.move_to((16 - len(name)) // 2, 0)
                 self.lcd.putstr(name)
+
+            # Mark each relaxed criterion with a ~ so the whole set fits on the bottom line
+            if relaxed:
+                line = ' '.join(f'~{LCDWrapper.RELAXED_LABELS.get(criterion, criterion)}' for criterion in relaxed)
+                self.lcd.move_to(max(0, (16 - len(line)) // 2), 1)
+                self.lcd.putstr(line[:16])
         # If the provided game is None, display no game found message centered on top line
         else:
             message = 'No game found.'
             self.lcd.move_to((16 - len(message)) // 2, 0)
             self.lcd.putstr(message)
 
+    def display_games(self, games: list):
+        """
+        Given a shortlist of game objects, update LCD with the name of the first two, one per line
+
+        Args:
+             games: [Game], provided game objects that will be displayed on LCD
+        """
+        self.clear()
+        if games:
+            # Long names are cut so each game keeps to its own line
+            for row in range(min(len(games), 2)):
+                name = games[row].name[:16]
+                self.lcd.move_to((16 - len(name)) // 2, row)
+                self.lcd.putstr(name)
+        else:
+            message = 'No game found.'
+            self.lcd.move_to((16 - len(message)) // 2, 0)
+            self.lcd.putstr(message)
+
     def display_ip(self, ip: str):
         """
         Present the IP address where the webserver is hosted on the LCD
@@ -1,11 +1,20 @@
-from game import Game
+import metrics
 from lcd_wrapper import LCDWrapper
 from machine import Pin
+from time import ticks_ms, ticks_diff
 from rotary_encoder import RotaryEncoder
 from webserver import Webserver
+from games_db import GamesDB
 from games_db_wrapper import DBWrapper
 
+try:
+    import asyncio
+except ImportError:
+    # Older MicroPython firmware only has the asyncio module under its old name
+    import uasyncio as asyncio
 
+
+@metrics.timed_isr('isr.encoder_handler')
 def encoder_handler(pin):
     """
     Handler function for Rising and Falling changes in Rotary Encoder
@@ -13,8 +22,8 @@ def encoder_handler(pin):
     Args:
         Pin, unused but required
     """
-    # Will need to access the LCD, Rotary Encoder and display_index value
-    global lcd, re, display_index
+    # Will need to access the Rotary Encoder and display_index value
+    global re, display_index
 
     # Read the current states of the CLK and DT pins
     clk_state = re.clk_pin.value()
@@ -45,10 +54,10 @@ def encoder_handler(pin):
         re.prev_clk_state = clk_state
         re.prev_dt_state = dt_state
 
-        # If the last quadrature counter doesn't match the current value, update previous value and update LCD
+        # If the last quadrature counter doesn't match the current value, wake the dial task to update the LCD, the slow
+        # I2C writes happen there instead of in the interrupt
         if re.qtr_counter != re.last_qtr_counter:
-            re.last_qtr_counter = re.qtr_counter
-            lcd.update_duration(re.qtr_counter)
+            dial_flag.set()
 
 def get_players() -> int:
     """
@@ -67,10 +76,46 @@ def get_players() -> int:
 
 def get_random_game_wrapper(qtr_counter: int):
     """
-    Wrapper function to the database call to get the randomly selected game
+    Wrapper function to the database call to get the randomly selected game, falling back to the closest game when
+    nothing matches, returns the game and the names of any criteria it doesn't meet
+    """
+    global db
+    players = get_players()
+    game = db.get_random_game(players=players, duration=qtr_counter, complexity=False, mode=GamesDB.WEIGHTED)
+    if game:
+        return game, ()
+    nearest = db.get_nearest_games(players=players, duration=qtr_counter, complexity=False)
+    return nearest[0] if nearest else (None, ())
+
+def get_shortlist_wrapper(qtr_counter: int):
+    """
+    Wrapper function to the database call to get a shortlist of different random games, one for each line of the LCD
+    """
+    global db
+    return db.get_random_games(k=2, players=get_players(), duration=qtr_counter, complexity=False)
+
+def display_game(pick: tuple):
+    """
+    Show the picked game on the LCD, along with any criteria it had to relax
+    """
+    global lcd
+    lcd.display_game(*pick)
+
+def count_matches(qtr_counter: int) -> int:
+    """
+    Wrapper function to the database call counting the games that match the dial, a table lookup cheap enough to run
+    on every turn of the dial
     """
     global db
-    return db.get_random_game(players=get_players(), duration=qtr_counter, complexity=False)
+    return db.count_matches(players=get_players(), duration=qtr_counter, complexity=False)
+
+def display_duration(qtr_counter: int):
+    """
+    Show the duration display with the current dial value and the number of games that match it, the qtr_counter
+    argument from the displays list is only the value when the list was made so the live dial value is used instead
+    """
+    global lcd, re
+    lcd.display_duration(re.qtr_counter, count_matches(re.qtr_counter))
 
 def set_display():
     """
@@ -89,32 +134,95 @@ def set_display():
     else:
         display_index += 1
 
+@metrics.timed_isr('isr.button_handler')
 def button_handler(pin):
     """
-    Handler function for the rotary encoder button
+    Handler function for the rotary encoder button, only records the press and wakes the button task on release
 
     Args:
         Pin: unused but required
     """
-    # Will need access to the LCD, Rotary Encoder, Database, and displaying_ip bool
-    global re, display_index, displays
-
-    # Temporarily set the button handler function to None to prevent conflicting function calls
-    re.sw_pin.irq(handler=None)
+    global re, button_pressed_at, button_held_ms
 
     # If button current state is High and previous state was low
     if re.sw_pin.value() == 1 and re.prev_button_state == 0:
-        
-        if display_index == 2:
-            displays[display_index][1] = get_random_game_wrapper(re.qtr_counter)
-        
-        set_display()
+        # Hand how long the button was held to the button task, which tells a long press from a short one
+        button_held_ms = ticks_diff(ticks_ms(), button_pressed_at)
         re.prev_button_state = 1
+        button_flag.set()
     elif re.sw_pin.value() == 0 and re.prev_button_state == 1:
+        # Remember when the button went down to tell a long press from a short one on release
+        button_pressed_at = ticks_ms()
         re.prev_button_state = 0
 
-    # Reset the button handler function to accept calls again
-    re.sw_pin.irq(handler=button_handler)
+def publish_pick():
+    """
+    Tell the browsers listening on /events about the games the LCD is showing, the names of the picked games and the
+    criteria the pick had to relax
+    """
+    global displays, ws
+    func, params = displays[2]
+    if func == display_game:
+        game, relaxed = params
+        ws.events.publish('pick', {'games': [game.name] if game else [], 'relaxed': list(relaxed)})
+    else:
+        ws.events.publish('pick', {'games': [game.name for game in params], 'relaxed': []})
+
+async def button_task():
+    """
+    Task picking games and cycling the LCD displays each time the button is released
+    """
+    global re, display_index, displays
+
+    while True:
+        await button_flag.wait()
+        if display_index == 2:
+            # Holding the button shows a shortlist of games instead of a single game
+            if button_held_ms >= LONG_PRESS_MS:
+                displays[display_index] = [lcd.display_games, get_shortlist_wrapper(re.qtr_counter)]
+            else:
+                displays[display_index] = [display_game, get_random_game_wrapper(re.qtr_counter)]
+            publish_pick()
+        set_display()
+
+async def dial_task():
+    """
+    Task updating the duration display as the dial turns, several turns between updates are drawn as one
+    """
+    global lcd, re, display_index
+
+    while True:
+        await dial_flag.wait()
+        # This needs to be index 2 because the display index is incremented at the end of the set_display function
+        if display_index == 2 and re.qtr_counter != re.last_qtr_counter:
+            re.last_qtr_counter = re.qtr_counter
+            lcd.update_duration(re.qtr_counter, count_matches(re.qtr_counter))
+            # Browsers only get the latest duration of a fast spin, the webserver coalesces the changes
+            ws.events.publish('duration', re.qtr_counter)
+
+async def flush_task():
+    """
+    Task writing any database changes held in memory once they have waited long enough
+    """
+    global db
+
+    while True:
+        db.flush_if_due()
+        await asyncio.sleep_ms(FLUSH_CHECK_MS)
+
+async def run(ws: Webserver):
+    """
+    Run the webserver and the input tasks side by side on the event loop, each HTTP client is handled in a task of its
+    own so neither a request nor the dial has to wait for the other
+
+    Args:
+        ws: Webserver, connected webserver to start
+    """
+    await ws.start()
+    ws.events.publish('duration', re.qtr_counter)
+    asyncio.create_task(button_task())
+    asyncio.create_task(dial_task())
+    await flush_task()
 
 
 # Create the LCD Wrapper class
@@ -140,25 +248,25 @@ priority_encoder_a1 = Pin(11, Pin.IN)
 priority_encoder_a2 = Pin(12, Pin.IN)
 
 # List of the different functions and arguments needed to cycle through on the LCD screen
-displays = [[lcd.display_ip, None], [lcd.display_duration, re.qtr_counter], [lcd.display_game, None]]
+displays = [[lcd.display_ip, None], [display_duration, re.qtr_counter], [display_game, (None, ())]]
 display_index = 0
 
-# Create the Webserver context manager
-with Webserver() as ws:
+# Holding the button for at least this many milliseconds before releasing it is a long press
+LONG_PRESS_MS = 600
+button_pressed_at = 0
+button_held_ms = 0
+
+# Milliseconds between checks for database changes that are due to be written
+FLUSH_CHECK_MS = 500
+
+# Flags set by the interrupt handlers to wake the tasks that do the slow work, safe to set from an interrupt
+dial_flag = asyncio.ThreadSafeFlag()
+button_flag = asyncio.ThreadSafeFlag()
+
+# Create the Webserver context manager, it handles every request, including adding games, straight with the database
+with Webserver(db=db) as ws:
     # Set the argument associated with the display_ip function to the generated IP address and display it on LCD
     displays[0][1] = ws.ip
     set_display()
-    
-    prev_status = None
 
-    while True:
-        try:
-            # Serve client requests from the webserver
-            new_game_params = ws.serve(ws.connection, prev_status)
-            print(f'new game params: {new_game_params}')
-            if new_game_params:
-                print(f'previous status: {prev_status}')
-                prev_status = db.insert_game(Game(None, *new_game_params))
-                print(f'new status: {prev_status}')
-        except StopIteration:
-            pass
+    asyncio.run(run(ws))
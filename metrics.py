@@ -0,0 +1,166 @@
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # Desktop CPython, used for benchmarking, has no ticks functions
+    from time import perf_counter_ns
+
+    def ticks_us() -> int:
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(end: int, start: int) -> int:
+        return end - start
+
+# Set to False to turn the timing off, the decorators then hand back the functions undecorated so timing costs nothing
+ENABLED = True
+
+# Most names that can be timed, every counter is allocated up front so recording a time never allocates, which keeps it
+# safe inside interrupt handlers
+MAX_NAMES = 32
+
+# Name of each timed function and, at the same position, its number of calls, total time and longest time
+_names: [str] = []
+_calls = array('I', [0] * MAX_NAMES)
+_total_us = array('Q', [0] * MAX_NAMES)
+_max_us = array('I', [0] * MAX_NAMES)
+
+
+def register(name: str) -> int:
+    """
+    Reserve the counters for a name, registering a name again returns the counters it already has
+
+    Args:
+        name: str, name the times are reported under
+
+    Returns:
+        int: position of the name's counters
+    """
+    if name in _names:
+        return _names.index(name)
+    if len(_names) == MAX_NAMES:
+        raise ValueError(f'No counters left for {name}, raise MAX_NAMES')
+    _names.append(name)
+    return len(_names) - 1
+
+
+def record(slot: int, elapsed_us: int):
+    """
+    Add a call and its time to a name's counters
+
+    Args:
+        slot: int, position of the name's counters from register
+        elapsed_us: int, time the call took in microseconds
+    """
+    _calls[slot] += 1
+    _total_us[slot] += elapsed_us
+    if elapsed_us > _max_us[slot]:
+        _max_us[slot] = elapsed_us
+
+
+def timed(name: str):
+    """
+    Decorator that times every call of a function under a name, for functions that aren't called from interrupts
+
+    Args:
+        name: str, name the times are reported under
+
+    Returns:
+        the decorator, which returns the function untouched when timing is disabled
+    """
+    if not ENABLED:
+        return lambda func: func
+    slot = register(name)
+
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            start = ticks_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(slot, ticks_diff(ticks_us(), start))
+        return wrapper
+    return decorator
+
+
+def timed_async(name: str):
+    """
+    Decorator that times every call of a coroutine function under a name, from its first step until it returns, so the
+    time includes any time spent waiting on the event loop
+
+    Args:
+        name: str, name the times are reported under
+
+    Returns:
+        the decorator, which returns the function untouched when timing is disabled
+    """
+    if not ENABLED:
+        return lambda func: func
+    slot = register(name)
+
+    def decorator(func):
+        async def wrapper(*args, **kwargs):
+            start = ticks_us()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(slot, ticks_diff(ticks_us(), start))
+        return wrapper
+    return decorator
+
+
+def timed_isr(name: str, arg_count: int = 1):
+    """
+    Decorator that times every call of a function under a name without allocating, for interrupt handlers and anything
+    they call. Packing *args into a tuple would allocate, so the wrapper takes a fixed number of arguments.
+
+    Args:
+        name: str, name the times are reported under
+        arg_count: int, default 1, number of arguments the function takes, 1 or 2, counting self for methods
+
+    Returns:
+        the decorator, which returns the function untouched when timing is disabled
+    """
+    if not ENABLED:
+        return lambda func: func
+    slot = register(name)
+
+    def decorator(func):
+        def wrapper_1(arg):
+            start = ticks_us()
+            result = func(arg)
+            record(slot, ticks_diff(ticks_us(), start))
+            return result
+
+        def wrapper_2(arg_1, arg_2):
+            start = ticks_us()
+            result = func(arg_1, arg_2)
+            record(slot, ticks_diff(ticks_us(), start))
+            return result
+        return wrapper_1 if arg_count == 1 else wrapper_2
+    return decorator
+
+
+def report() -> str:
+    """
+    Plain text report of every timed name, one per line
+
+    Returns:
+        str: the report, a header line followed by the name, calls, total, mean and longest microseconds of each name
+    """
+    lines = ['# name calls total_us mean_us max_us']
+    for slot in range(len(_names)):
+        calls = _calls[slot]
+        lines.append(f'{_names[slot]} {calls} {_total_us[slot]} {_total_us[slot] // calls if calls else 0} '
+                     f'{_max_us[slot]}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """
+    Zero every counter, the names stay registered
+    """
+    for slot in range(MAX_NAMES):
+        _calls[slot] = 0
+        _total_us[slot] = 0
+        _max_us[slot] = 0
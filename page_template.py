@@ -0,0 +1,110 @@
+import hashlib
+from binascii import hexlify
+
+
+class PageTemplate:
+    def __init__(self, file_name: str):
+        """
+        Page read once at startup and split into its static parts and the %NAME% placeholders between them, so serving
+        it only sends slices of the same bytes instead of building a new copy of the page for every request.
+
+        Every static part is a memoryview over the page's bytes, which slices without copying, and the tag of the page
+        is worked out from its contents once so an unchanged page can be answered with 304 Not Modified.
+
+        Args:
+            file_name: str, name of the page's file
+        """
+        with open(file_name, 'rb') as f:
+            self._page = f.read()
+        # Static parts and placeholder names in page order, the static parts as memoryviews and the names as strings
+        self.parts: [memoryview | str] = []
+        # Length of every static part added together, the placeholders' values are added to it for each response
+        self.static_length = 0
+        self.tag = hexlify(hashlib.sha256(self._page).digest()[:8]).decode()
+
+        page = memoryview(self._page)
+        start = 0
+        position = self._page.find(b'%')
+        while position != -1:
+            end = self._page.find(b'%', position + 1)
+            if end == -1:
+                break
+            name = self._page[position + 1:end]
+            # Only an upper case name between two % signs is a placeholder, any other % is part of the page
+            if not name or not all(char == ord('_') or ord('A') <= char <= ord('Z') for char in name):
+                position = end
+                continue
+            self._add_static(page[start:position])
+            self.parts.append(name.decode())
+            start = end + 1
+            position = self._page.find(b'%', start)
+        self._add_static(page[start:])
+
+    def _add_static(self, part: memoryview):
+        """
+        Helper function to add a static part of the page, empty parts are left out
+
+        Args:
+            part: memoryview, slice of the page
+        """
+        if len(part):
+            self.parts.append(part)
+            self.static_length += len(part)
+
+    def chunks(self, values: {str: bytes}):
+        """
+        Generator of the parts of the page in order, with each placeholder filled in from the values
+
+        Args:
+            values: {str: bytes}, value of each placeholder, a placeholder missing from it is left empty
+
+        Returns:
+            generator of memoryview or bytes, the parts of the page, empty values are skipped
+        """
+        for part in self.parts:
+            if isinstance(part, str):
+                part = values.get(part, b'')
+                if not part:
+                    continue
+            yield part
+
+    def length(self, values: {str: bytes}) -> int:
+        """
+        Length of the page with its placeholders filled in, without building it
+
+        Args:
+            values: {str: bytes}, value of each placeholder
+
+        Returns:
+            int: number of bytes in the page
+        """
+        return self.static_length + sum(len(values.get(part, b'')) for part in self.parts if isinstance(part, str))
+
+    def render(self, values: {str: bytes}) -> bytes:
+        """
+        Build the whole page with its placeholders filled in, for small pages used as the value of another placeholder
+
+        Args:
+            values: {str: bytes}, value of each placeholder
+
+        Returns:
+            bytes: the page
+        """
+        # MicroPython's bytes.join won't take memoryviews, a bytearray extends from either
+        page = bytearray()
+        for chunk in self.chunks(values):
+            page += chunk
+        return bytes(page)
+
+    def etag(self, version: str) -> str:
+        """
+        Entity tag of the page for the given version of its placeholder values, changes whenever the page's file or the
+        version does
+
+        Args:
+            version: str, short text that changes whenever the placeholder values would
+
+        Returns:
+            str: the quoted tag, as sent in the ETag header
+        """
+        return f'"{self.tag}-{version}"'
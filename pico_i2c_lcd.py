@@ -1,6 +1,7 @@
 import utime
 import gc
 
+import metrics
 from lcd_api import LcdApi
 from machine import I2C
 
@@ -61,6 +62,7 @@ class I2cLcd(LcdApi):
         self.i2c.writeto(self.i2c_addr, bytes([0]))
         gc.collect()
 
+    @metrics.timed_isr('lcd.hal_write_command', 2)
     def hal_write_command(self, cmd):
         # Write a command to the LCD. Data is latched on the falling edge of E.
         byte = ((self.backlight << SHIFT_BACKLIGHT) |
@@ -76,6 +78,7 @@ class I2cLcd(LcdApi):
             utime.sleep_ms(5)
         gc.collect()
 
+    @metrics.timed_isr('lcd.hal_write_data', 2)
     def hal_write_data(self, data):
         # Write data to the LCD. Data is latched on the falling edge of E.
         byte = (MASK_RS |
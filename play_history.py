@@ -0,0 +1,139 @@
+import os
+import time
+
+
+class PlayHistory:
+    # A game picked for play drops to this share of its weight and climbs back to full weight over the recovery period
+    MIN_WEIGHT_PERCENT = 10
+    RECOVERY_SECONDS = 14 * 24 * 60 * 60
+
+    # Weight of a game that hasn't been picked recently, a favorite's weight is multiplied by its boost
+    BASE_WEIGHT = 100
+    MAX_BOOST = 5
+
+    # Record markers at the start of each line of the history file
+    _PICK = 'P'
+    _FAVORITE = 'F'
+
+    def __init__(self, file_name: str):
+        """
+        History of the games picked and the favorite boosts set by the user, used to weight random selection so games
+        picked recently come up less often until they recover. The history file is append-only, the latest record for a
+        game wins when it is read back.
+
+        Args:
+            file_name: str, name of the history txt file
+        """
+        self.file_name = file_name
+
+        # Time each game was last picked, only for games that haven't fully recovered yet
+        self.recent: {int: int} = {}
+        # Boost of each favorite game
+        self.favorites: {int: int} = {}
+
+        if self.file_name not in os.listdir():
+            with open(self.file_name, 'w') as f:
+                print(f'Creating {self.file_name}')
+        self._load()
+
+    def _load(self):
+        """
+        Helper function to replay the history file, compacting it if it is mostly old records
+        """
+        now = int(time.time())
+        record_count = 0
+        with open(self.file_name, 'r') as f:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                record_count += 1
+                fields = line.rstrip('\r\n').split(',')
+                try:
+                    if fields[0] == PlayHistory._PICK:
+                        self.recent[int(fields[1])] = int(fields[2])
+                    elif fields[0] == PlayHistory._FAVORITE:
+                        # A boost of 1 clears an earlier favorite record
+                        if int(fields[2]) > 1:
+                            self.favorites[int(fields[1])] = int(fields[2])
+                        else:
+                            self.favorites.pop(int(fields[1]), None)
+                except (IndexError, ValueError):
+                    print(f'Skipping malformed line {record_count} in {self.file_name}')
+        self.prune(now)
+
+        # Rewrite the file with only the current records once old ones make up most of it
+        if record_count > 2 * (len(self.recent) + len(self.favorites)) + 32:
+            with open(self.file_name, 'w') as f:
+                for game_id, picked_at in self.recent.items():
+                    f.write(f'{PlayHistory._PICK},{game_id},{picked_at}\n')
+                for game_id, boost in self.favorites.items():
+                    f.write(f'{PlayHistory._FAVORITE},{game_id},{boost}\n')
+
+    def weight(self, game_id: int, now: int) -> int:
+        """
+        Current selection weight of a game
+
+        Args:
+            game_id: int, ID of the game
+            now: int, current time in seconds
+
+        Returns:
+            int: weight of the game, at least 1
+        """
+        base = PlayHistory.BASE_WEIGHT * self.favorites.get(game_id, 1)
+        picked_at = self.recent.get(game_id)
+        if picked_at is None:
+            return base
+        elapsed = now - picked_at
+        # A pick in the future means the clock was reset, treat the game as recovered
+        if elapsed < 0 or elapsed >= PlayHistory.RECOVERY_SECONDS:
+            return base
+        percent = PlayHistory.MIN_WEIGHT_PERCENT + \
+            (100 - PlayHistory.MIN_WEIGHT_PERCENT) * elapsed // PlayHistory.RECOVERY_SECONDS
+        return max(1, base * percent // 100)
+
+    def record_pick(self, game_id: int, now: int):
+        """
+        Record that a game was picked, appending it to the history file
+
+        Args:
+            game_id: int, ID of the game
+            now: int, current time in seconds
+        """
+        self.recent[game_id] = now
+        with open(self.file_name, 'a') as f:
+            f.write(f'{PlayHistory._PICK},{game_id},{now}\n')
+
+    def set_favorite(self, game_id: int, boost: int):
+        """
+        Set how much more often a favorite game should come up, appending it to the history file
+
+        Args:
+            game_id: int, ID of the game
+            boost: int, weight multiplier from 1, not a favorite, to MAX_BOOST
+        """
+        boost = min(max(1, boost), PlayHistory.MAX_BOOST)
+        if boost == 1:
+            self.favorites.pop(game_id, None)
+        else:
+            self.favorites[game_id] = boost
+        with open(self.file_name, 'a') as f:
+            f.write(f'{PlayHistory._FAVORITE},{game_id},{boost}\n')
+
+    def prune(self, now: int) -> bool:
+        """
+        Forget the picks of games that have fully recovered, they are back at their base weight. Picks that look like
+        they are in the future are kept, the clock may not have been set from the network yet.
+
+        Args:
+            now: int, current time in seconds
+
+        Returns:
+            bool: whether any picks were forgotten
+        """
+        recovered = [game_id for game_id, picked_at in self.recent.items()
+                     if now - picked_at >= PlayHistory.RECOVERY_SECONDS]
+        for game_id in recovered:
+            del self.recent[game_id]
+        return bool(recovered)
@@ -0,0 +1,94 @@
+import random
+from array import array
+
+
+class ShuffleBag:
+    def __init__(self):
+        """
+        Bag of IDs drawn in a shuffled order without repeats until every ID has been drawn. The IDs are shuffled once
+        when the bag is filled and drawn from the end, so each draw takes O(1).
+
+        The IDs not yet drawn sit at the front of the array and the IDs already drawn after them, which lets the bag be
+        patched when the IDs it should hold change without forgetting which have been drawn.
+        """
+        self.ids = array('I')
+        # Number of IDs at the front of the array that haven't been drawn yet
+        self.remaining = 0
+
+    def __len__(self) -> int:
+        return self.remaining
+
+    def refill(self, ids: [int]):
+        """
+        Start the bag over with every ID undrawn, shuffled with a Fisher-Yates shuffle
+
+        Args:
+            ids: [int], every ID the bag should hold
+        """
+        self.ids = array('I', ids)
+        for position in range(len(self.ids) - 1, 0, -1):
+            other = random.randint(0, position)
+            self.ids[position], self.ids[other] = self.ids[other], self.ids[position]
+        self.remaining = len(self.ids)
+
+    def draw(self) -> int:
+        """
+        Draw the next ID, the bag must not be empty
+
+        Returns:
+            int: the drawn ID
+        """
+        self.remaining -= 1
+        return self.ids[self.remaining]
+
+    def add(self, item_id: int):
+        """
+        Add an ID to the undrawn IDs at a random position, an ID already in the bag, drawn or not, is left alone
+
+        Args:
+            item_id: int, ID being added
+        """
+        if self._find(item_id) >= 0:
+            return
+        # Move the first drawn ID to the end to make room at the end of the undrawn IDs
+        self.ids.append(item_id)
+        last = len(self.ids) - 1
+        self.ids[last], self.ids[self.remaining] = self.ids[self.remaining], self.ids[last]
+        # Then swap the new ID with a random undrawn one so it isn't simply drawn next
+        other = random.randint(0, self.remaining)
+        self.ids[self.remaining], self.ids[other] = self.ids[other], self.ids[self.remaining]
+        self.remaining += 1
+
+    def discard(self, item_id: int):
+        """
+        Remove an ID from the bag, drawn or not, if it is in it
+
+        Args:
+            item_id: int, ID being removed
+        """
+        position = self._find(item_id)
+        if position < 0:
+            return
+        # An undrawn ID is first swapped to the end of the undrawn IDs, where it is treated as drawn
+        if position < self.remaining:
+            self.remaining -= 1
+            self.ids[position], self.ids[self.remaining] = self.ids[self.remaining], self.ids[position]
+            position = self.remaining
+        # Then the last ID fills its place and the array shrinks by one
+        self.ids[position] = self.ids[len(self.ids) - 1]
+        self.ids = self.ids[:len(self.ids) - 1]
+
+    def _find(self, item_id: int) -> int:
+        """
+        Helper function for the position of an ID in the bag, a linear scan since the bag is only patched on writes
+
+        Args:
+            item_id: int, ID to find
+
+        Returns:
+            int: position of the ID or -1 if it isn't in the bag
+        """
+        for position in range(len(self.ids)):
+            if self.ids[position] == item_id:
+                return position
+        return -1
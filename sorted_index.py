@@ -0,0 +1,200 @@
+from array import array
+
+
+class SortedIndex:
+    def __init__(self, table_size: int = 0):
+        """
+        Index of game IDs kept sorted by an integer key, such as a game's duration, so that every game with a key in a
+        given range sits in one contiguous slice that can be found with two binary searches.
+
+        The keys and IDs are held in two parallel lists rather than a list of tuples to keep the index small on the
+        Pico's heap, and MicroPython doesn't ship the bisect module so the binary searches are written out here.
+
+        When the keys that get searched for come from a small known range, like the minutes on the duration dial, the
+        index can also keep a precomputed table of where each key in that range starts. Searches for those keys are
+        then a single table lookup instead of a binary search.
+
+        Args:
+            table_size: int, default 0, keys from 0 up to this size have their start position precomputed
+        """
+        self.keys: [int] = []
+        self.ids: [int] = []
+
+        # Number of keys less than each table key, which is exactly the position where that key starts
+        self._starts = array('I', [0] * table_size) if table_size else None
+
+        # Fenwick tree of selection weights lined up with the positions in the index, built by whoever draws weighted
+        # positions from the index and dropped whenever a change moves the positions
+        self.weights = None
+        # Time the weights were last brought up to date, in seconds
+        self.weights_time = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def bisect_left(self, key: int) -> int:
+        """
+        Find the first position in the index whose key is not less than the given key
+
+        Args:
+            key: int, key being searched for
+
+        Returns:
+            int: position where the key would be inserted before any equal keys
+        """
+        if self._starts is not None and 0 <= key < len(self._starts):
+            return self._starts[key]
+        lo, hi = 0, len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.keys[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, key: int) -> int:
+        """
+        Find the first position in the index whose key is greater than the given key
+
+        Args:
+            key: int, key being searched for
+
+        Returns:
+            int: position where the key would be inserted after any equal keys
+        """
+        # Keys are integers, so everything up to this key ends where the next key starts
+        if self._starts is not None and 0 <= key + 1 < len(self._starts):
+            return self._starts[key + 1]
+        lo, hi = 0, len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < self.keys[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def window(self, lo_key: int, hi_key: int) -> (int, int):
+        """
+        Find the slice of the index holding every key from lo_key to hi_key inclusive
+
+        Args:
+            lo_key: int, smallest key in the window
+            hi_key: int, largest key in the window
+
+        Returns:
+            (int, int): start and end positions of the slice, end is exclusive
+        """
+        return self.bisect_left(lo_key), self.bisect_right(hi_key)
+
+    def add(self, key: int, item_id: int) -> int:
+        """
+        Insert an ID into the index after any IDs with an equal key, shifting the rest along instead of re-sorting
+
+        Args:
+            key: int, sort key of the item
+            item_id: int, ID of the item being added
+
+        Returns:
+            int: position the ID was inserted at
+        """
+        position = self.bisect_right(key)
+        self.weights = None
+        self.keys.insert(position, key)
+        self.ids.insert(position, item_id)
+        # Only the table keys above the new key start one position later
+        self._shift_starts(key, 1)
+        return position
+
+    def clear(self):
+        """
+        Remove every ID from the index
+        """
+        self.keys = []
+        self.ids = []
+        self.weights = None
+        if self._starts is not None:
+            for table_key in range(len(self._starts)):
+                self._starts[table_key] = 0
+
+    def append_unsorted(self, key: int, item_id: int):
+        """
+        Append an ID to the end of the index without keeping it sorted, for bulk loading followed by a single sort()
+
+        Args:
+            key: int, sort key of the item
+            item_id: int, ID of the item being appended
+        """
+        self.keys.append(key)
+        self.ids.append(item_id)
+        self.weights = None
+
+    def sort(self):
+        """
+        Sort the whole index by key once after bulk loading it with append_unsorted, equal keys keep their order
+        """
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.keys = [self.keys[position] for position in order]
+        self.ids = [self.ids[position] for position in order]
+        self.weights = None
+
+        # Fill in the whole table with one walk through the sorted keys
+        if self._starts is not None:
+            position = 0
+            for table_key in range(len(self._starts)):
+                while position < len(self.keys) and self.keys[position] < table_key:
+                    position += 1
+                self._starts[table_key] = position
+
+    def find(self, key: int, item_id: int) -> int:
+        """
+        Find the position of an ID in the index, must be given the key it was added with
+
+        Args:
+            key: int, sort key the item was added with
+            item_id: int, ID of the item
+
+        Returns:
+            int: position of the ID or -1 if it isn't in the index
+        """
+        # Only the run of equal keys needs searching for the ID
+        position = self.bisect_left(key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.ids[position] == item_id:
+                return position
+            position += 1
+        return -1
+
+    def remove(self, key: int, item_id: int) -> int:
+        """
+        Remove an ID from the index, must be given the key it was added with
+
+        Args:
+            key: int, sort key the item was added with
+            item_id: int, ID of the item being removed
+
+        Returns:
+            int: position the ID was removed from
+        """
+        position = self.find(key, item_id)
+        if position < 0:
+            raise ValueError(f'{item_id} is not in the index')
+        self.weights = None
+        del self.keys[position]
+        del self.ids[position]
+        self._shift_starts(key, -1)
+        return position
+
+    def _shift_starts(self, key: int, change: int):
+        """
+        Helper function to move the start positions of every table key above a key that was added or removed
+
+        Args:
+            key: int, the key that was added or removed
+            change: int, 1 if it was added or -1 if it was removed
+        """
+        if self._starts is None:
+            return
+        for table_key in range(max(0, key + 1), len(self._starts)):
+            self._starts[table_key] += change
@@ -0,0 +1,124 @@
+from array import array
+
+
+class TrigramIndex:
+    def __init__(self):
+        """
+        Index of the three character runs, trigrams, in each item's name, used to find names that share most of their
+        trigrams with a search even when it has typos in it.
+
+        Each trigram is packed into an integer from its three bytes, so no trigram strings are kept. A trigram found in
+        a single name maps straight to that item's ID, which is most of them, and only trigrams shared by several names
+        get an array of IDs, kept sorted.
+        """
+        self._postings: {int: int | array} = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    @staticmethod
+    def trigrams(name: str) -> set:
+        """
+        Get the packed trigrams of a name, padded with spaces so the start and end of the name count as well
+
+        Args:
+            name: str, name, already normalized
+
+        Returns:
+            set: the packed trigrams
+        """
+        encoded = f'  {name} '.encode()
+        return {encoded[position] << 16 | encoded[position + 1] << 8 | encoded[position + 2]
+                for position in range(len(encoded) - 2)}
+
+    def add(self, item_id: int, name: str):
+        """
+        Add an item under every trigram in its name
+
+        Args:
+            item_id: int, ID of the item
+            name: str, name of the item, already normalized
+        """
+        for trigram in TrigramIndex.trigrams(name):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                self._postings[trigram] = item_id
+            elif isinstance(posting, int):
+                if posting != item_id:
+                    self._postings[trigram] = array('I', (min(posting, item_id), max(posting, item_id)))
+            else:
+                position = TrigramIndex._bisect(posting, item_id)
+                if position == len(posting):
+                    posting.append(item_id)
+                elif posting[position] != item_id:
+                    # MicroPython arrays have no insert, rebuild the array around the new ID
+                    head = posting[:position]
+                    head.append(item_id)
+                    self._postings[trigram] = head + posting[position:]
+
+    def remove(self, item_id: int, name: str):
+        """
+        Remove an item from every trigram in its name, must be given the name it was added with
+
+        Args:
+            item_id: int, ID of the item
+            name: str, name the item was added with, already normalized
+        """
+        for trigram in TrigramIndex.trigrams(name):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                continue
+            if isinstance(posting, int):
+                if posting == item_id:
+                    del self._postings[trigram]
+                continue
+            position = TrigramIndex._bisect(posting, item_id)
+            if position < len(posting) and posting[position] == item_id:
+                posting = posting[:position] + posting[position + 1:]
+                # Back to a single ID once only one name has the trigram
+                self._postings[trigram] = posting[0] if len(posting) == 1 else posting
+
+    def search(self, name: str, min_shared: int) -> {int: int}:
+        """
+        Count the trigrams each item shares with a search, only reading the IDs under the search's own trigrams
+
+        Args:
+            name: str, the search, already normalized
+            min_shared: int, fewest shared trigrams an item needs to be returned
+
+        Returns:
+            {int: int}: number of shared trigrams of each item with at least min_shared of them
+        """
+        shared = {}
+        for trigram in TrigramIndex.trigrams(name):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                continue
+            if isinstance(posting, int):
+                shared[posting] = shared.get(posting, 0) + 1
+            else:
+                for item_id in posting:
+                    shared[item_id] = shared.get(item_id, 0) + 1
+        return {item_id: count for item_id, count in shared.items() if count >= min_shared}
+
+    @staticmethod
+    def _bisect(ids: array, item_id: int) -> int:
+        """
+        Helper function to binary search a sorted array of IDs for the first position whose ID is not less than the
+        given ID
+
+        Args:
+            ids: array, sorted IDs
+            item_id: int, ID being searched for
+
+        Returns:
+            int: position of the ID if it is in the array, otherwise the position it would be inserted at
+        """
+        lo, hi = 0, len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids[mid] < item_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
@@ -1,31 +1,112 @@
+import json
+import metrics
 import network
+import ntptime
+import os
 import rp2
 import sys
-import socket
 
+from event_hub import EventHub
+from game import Game
+from http_request import HttpParser, HttpRequest
 from network_settings import NetworkSettings
+from page_template import PageTemplate
 from picozero import pico_led
 from time import sleep
 
+try:
+    import asyncio
+except ImportError:
+    # Older MicroPython firmware only has the asyncio module under its old name
+    import uasyncio as asyncio
+
 
 class Webserver:
     status_codes: {int: str} = {
+        200: "OK",
         201: "Successfully Created",
+        304: "Not Modified",
         400: "Error: Bad Request",
         404: "Error: Not Found",
-        409: "Error: Conflict"
+        409: "Error: Conflict",
+        413: "Error: Payload Too Large",
+        503: "Error: Service Unavailable"
     }
 
-    def __init__(self):
-        # The __init__ will run before the __enter__ so set ip and connection to None, they will be updated in __enter__
+    # Port the server listens on and how many clients can wait to be accepted at once
+    PORT = 80
+    BACKLOG = 4
+
+    # Seconds a kept alive connection may sit idle, or a request take to arrive, before it is closed
+    KEEP_ALIVE_SECONDS = 5
+
+    # File an uploaded CSV file is spooled to before it is imported, and the number of rows imported between turns of
+    # the event loop
+    UPLOAD_FILE = 'upload.csv'
+    IMPORT_BATCH_SIZE = 32
+
+    # Manifest of the minified and gzipped assets written by build_assets.py, the number of bytes of an asset read from
+    # flash and sent at a time, and the seconds browsers may keep an asset linked with its version
+    ASSET_MANIFEST = 'static/assets.json'
+    STATIC_CHUNK_SIZE = 512
+    ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+    # Fields of a new game sent in the body of a /game request, in the order Game takes them
+    GAME_FIELDS = ('name', 'min_players', 'max_players', 'duration', 'complexity')
+
+    # Number of games listed by the shortlist and closest games requests
+    SHORTLIST_SIZE = 5
+    # Number of games listed by a search
+    SEARCH_SIZE = 10
+
+    # Games on a page of /api/games when no limit is given and the most a limit can ask for, and the size the games'
+    # JSON is gathered to before it is sent as a chunk
+    API_PAGE_SIZE = 50
+    API_MAX_PAGE_SIZE = 200
+    API_CHUNK_SIZE = 512
+
+    # Most browsers listening to /events at once, each holds a connection open for as long as its page is open
+    MAX_EVENT_CLIENTS = 3
+    # Milliseconds an update waits for more changes to go out with it, so a fast spin of the dial sends a few updates
+    # rather than one for every step, seconds an update may take to send before the browser is dropped as too slow,
+    # and seconds of quiet before a comment is sent to check the browser is still there
+    EVENT_COALESCE_MS = 150
+    EVENT_SEND_SECONDS = 2
+    EVENT_PING_SECONDS = 15
+
+    def __init__(self, db=None):
+        """
+        Args:
+            db: DBWrapper, default None, database used by the requests, like imports and adding games
+        """
+        # The __init__ will run before the __enter__ so set ip to None, it will be updated in __enter__, and the server
+        # is only created once start is awaited on the event loop
         self.ip: str = None
-        self.connection = None
+        self.server = None
+        self.db = db
+
+        # Status of the last game added from the page, shown as an alert by the page once it loads /status
+        self.prev_status: int | None = None
 
-        # Get the html store in the text file as a variable to easily be served on request
-        self.html = open('index_html.txt').read()
+        # Live state of the device, like the dial's duration and the last picked game, pushed to browsers on /events
+        self.events = EventHub()
 
-        # TODO: There is no such thing as 'status_alert_html.txt' this will need to be created
-        self.status_alert = open('status_alert_html.txt').read()
+        # Parsers of closed connections kept for the next ones, so their buffers are allocated once rather than for
+        # every connection
+        self._parsers: [HttpParser] = []
+
+        # Split the html stored in the text files into static parts once, the page is only served from its template to
+        # browsers that can't take the gzipped page
+        self.page = PageTemplate('index_html.txt')
+        self.status_alert = PageTemplate('status_alert_html.txt')
+
+        # Path, file, type and tag of each gzipped asset, without built assets the page is served from its template
+        try:
+            with open(Webserver.ASSET_MANIFEST) as f:
+                self.assets: {str: dict} = json.load(f)
+        except OSError:
+            print(f'No {Webserver.ASSET_MANIFEST}, run build_assets.py to serve the page and stylesheet gzipped')
+            self.assets = {}
 
     def connect(self) -> str:
         """
@@ -51,6 +132,12 @@ class Webserver:
             pico_led.off()
             sleep(0.5)
 
+        # Set the clock from the network so the play history timestamps carry over between power cycles
+        try:
+            ntptime.settime()
+        except OSError:
+            print('Could not set the clock from the network')
+
         # Get IP address and return
         ip = wlan.ifconfig()[0]
         print(f'Connected on {ip}')
@@ -58,102 +145,615 @@ class Webserver:
 
         return ip
 
-    def open_socket(self, ip: str):
+    def create_status_alert(self, status_code: int) -> bytes:
         """
-        Open a socket for communication between devices on the network as clients and the Pico as server
+        Given a status code, create the correct alert to be displayed to the user
 
         Args:
-            ip: str, the IP address of the Pico taken from the connect function
+            status_code: int, integer value of the status code will be compared with class dictionary
+
+        Returns:
+            bytes, the div HTML for the alert that will be displayed
+        """
+        if status_code:
+            # Ensure status code is in 200s or 400s
+            if 200 <= status_code <= 299 or 400 <= status_code <= 499:
+                # Assign 'success' if in 200s or 'danger' if in 400s and the appropriate code meaning from dictionary
+                html = self.status_alert.render({'STATUS': b'success' if status_code <= 299 else b'danger',
+                                                 'MESSAGE': Webserver.status_codes[status_code].encode()})
+            else:
+                # If status code is outside 200s or 400s, it hasn't been implemented yet, don't display an alert
+                html = b""
+        else:
+            html = b""
+        return html
+
+    async def start(self):
         """
-        address = (ip, 80)
+        Start listening for clients, each client is then handled in its own task on the event loop so a slow client
+        never holds up the others or the dial
+        """
+        self.server = await asyncio.start_server(self.handle_client, '0.0.0.0', Webserver.PORT,
+                                                 backlog=Webserver.BACKLOG)
 
-        # If connection is None from the init function, begin creating the socket
-        if self.connection is None:
-            self.connection = socket.socket()
+    async def handle_client(self, reader, writer):
+        """
+        Serve every request a connected client sends until it asks to close the connection or goes quiet, then close
+        the connection, whatever happens
 
-        # Try to bind the address and begin listening, but if an error occurs, close the connection
+        Args:
+            reader: asyncio.StreamReader, stream of the requests from the client
+            writer: asyncio.StreamWriter, stream of the responses to the client
+        """
+        parser = self._parsers.pop() if self._parsers else HttpParser()
         try:
-            self.connection.bind(address)
-            self.connection.listen(1)
-        except OSError as e:
-            self.connection.close()
-            print('Had to close connection')
+            while True:
+                request = await Webserver._read_head(reader, parser)
+                if request is None:
+                    break
+                await self.handle_request(request, parser, reader, writer)
+                # Whatever of the body the handler didn't read is skipped to reach the next request
+                while parser.body_remaining:
+                    parser.take()
+                    if parser.body_remaining and not await Webserver._receive(reader, parser):
+                        break
+                if not request.keep_alive:
+                    break
+        except ValueError as e:
+            # A malformed request leaves no way to find the next one, so it is answered and the connection closed
+            try:
+                await Webserver._send(writer, 400, f'Bad request: {e}')
+            except OSError:
+                pass
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            print(f'An exception occurred while serving client: {e}')
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                # Whatever was still waiting to be sent to a client that has gone is dropped
+                pass
+            parser.reset()
+            if len(self._parsers) < Webserver.BACKLOG:
+                self._parsers.append(parser)
 
-    def create_status_alert(self, status_code: int) -> str:
+    @staticmethod
+    async def _receive(reader, parser: HttpParser) -> int:
         """
-        Given a status code, create the correct alert to be displayed to the user
+        Helper function to receive more of the request straight into the parser's buffer
 
         Args:
-            status_code: int, integer value of the status code will be compared with class dictionary
+            reader: asyncio.StreamReader, stream of the requests from the client
+            parser: HttpParser, parser of the connection
 
         Returns:
-            str, the div HTML for the alert that will be displayed
+            int: number of bytes received, 0 once the client has closed the connection
         """
-        if status_code:
-            # Ensure status code is in 200s or 400s
-            if 200 <= status_code <= 299 or 400 <= status_code <= 499:
-                # Assign 'success' if in 200s or 'danger' if in 400s
-                html = self.status_alert.replace('%STATUS%', 'success' if status_code <= 299 else 'danger')
-                # Replace message with the appropriate code meaning from dictionary
-                html.replace('%MESSAGE%', Webserver.status_codes[status_code])
+        space = parser.space()
+        if hasattr(reader, 'readinto'):
+            # MicroPython's streams read into a buffer without allocating
+            count = await asyncio.wait_for(reader.readinto(space), Webserver.KEEP_ALIVE_SECONDS)
+        else:
+            # CPython's streams only return new bytes, which are copied in
+            data = await asyncio.wait_for(reader.read(len(space)), Webserver.KEEP_ALIVE_SECONDS)
+            count = len(data)
+            space[:count] = data
+        parser.received(count or 0)
+        return count or 0
+
+    @staticmethod
+    async def _read_head(reader, parser: HttpParser) -> HttpRequest | None:
+        """
+        Helper function to receive until the parser has the line and headers of the next request
+
+        Args:
+            reader: asyncio.StreamReader, stream of the requests from the client
+            parser: HttpParser, parser of the connection
+
+        Returns:
+            HttpRequest | None: the next request, or None if the client closed the connection first
+        """
+        while True:
+            request = parser.parse_head()
+            if request is not None:
+                return request
+            if not await Webserver._receive(reader, parser):
+                return None
+
+    @staticmethod
+    async def _read_body(reader, parser: HttpParser, request: HttpRequest) -> bool:
+        """
+        Helper function to receive the whole body of a request into the request, for bodies small enough to handle in
+        memory like a form
+
+        Args:
+            reader: asyncio.StreamReader, stream of the requests from the client
+            parser: HttpParser, parser of the connection
+            request: HttpRequest, request whose body is read
+
+        Returns:
+            bool: whether the body fit in the parser's buffer and was read, the client closing the connection part way
+                through raises a ValueError
+        """
+        if request.content_length > len(parser.buffer):
+            return False
+        while parser.buffered() < parser.body_remaining:
+            if not await Webserver._receive(reader, parser):
+                raise ValueError('The body ended early')
+        request.body = bytes(parser.take())
+        return True
+
+    @metrics.timed_async('web.handle_request')
+    async def handle_request(self, request: HttpRequest, parser: HttpParser, reader, writer):
+        """
+        Answer a request whose line and headers have been read, its body is read by the handlers that need it
+
+        Args:
+            request: HttpRequest, the request
+            parser: HttpParser, parser of the connection, holding whatever of the body has been received
+            reader: asyncio.StreamReader, stream of the requests from the client
+            writer: asyncio.StreamWriter, stream of the responses to the client
+        """
+        path = request.path
+
+        # TODO: this will be need to be removed eventually
+        print(f'{request.method} {path}')
+
+        # Imports are answered with a summary instead of the page, the CSV file is the body of the request
+        if path.startswith('/import') and self.db:
+            await self.serve_import(parser, reader, writer)
+            return
+
+        # Timings are answered as plain text, they are only available while timing is enabled
+        if path.startswith('/metrics'):
+            await self.serve_metrics(writer)
+            return
+
+        # Searches are answered with the names of the best matches, they are sent on every keystroke
+        if path.startswith('/search') and self.db:
+            await self.serve_search(writer, request)
+            return
+
+        # Listings are answered with a page of games as JSON, generated as it is sent
+        if path == '/api/games' and self.db:
+            await self.serve_api_games(writer, request)
+            return
+
+        # Shortlists are answered with the names of the games instead of the page
+        if (path.startswith('/shortlist/') or path.startswith('/closest/')) and self.db:
+            await self.serve_shortlist(writer, request)
+            return
+
+        # The stylesheet and any other built assets are sent straight from flash
+        if path.startswith('/static/'):
+            await self.serve_asset(writer, request)
+            return
+
+        # Browsers listening for changes to the device's state keep the connection for the updates
+        if path == '/events':
+            await self.serve_events(reader, writer, request)
+            return
+
+        # The alert for the last game added is loaded by the page once it is shown
+        if path == '/status':
+            alert = self.create_status_alert(self.prev_status)
+            await Webserver._send_all(writer, Webserver._headers(200, 'text/html; charset=utf-8', len(alert)), alert)
+            return
+
+        # New games are answered with the status of the insert, which is also shown as an alert by the page
+        if (path == '/game' or path.startswith('/game/')) and self.db:
+            await self.serve_game(request, parser, reader, writer)
+            return
+
+        # Send the client the html
+        await self.serve_page(writer, request)
+
+    async def serve_game(self, request: HttpRequest, parser: HttpParser, reader, writer):
+        """
+        Insert the game in a form or JSON body with the fields name, min_players, max_players, duration and complexity,
+        or, from older pages, in the path /game/<name>/<min_players>/<max_players>/<duration>/<complexity>
+
+        Args:
+            request: HttpRequest, the request
+            parser: HttpParser, parser of the connection, holding whatever of the body has been received
+            reader: asyncio.StreamReader, stream of the requests from the client
+            writer: asyncio.StreamWriter, stream of the responses to the client
+        """
+        if not await Webserver._read_body(reader, parser, request):
+            await Webserver._send(writer, 413, 'The game is too large')
+            return
+
+        try:
+            if request.content_length:
+                fields = request.fields()
+                params = tuple(fields[field] for field in Webserver.GAME_FIELDS)
             else:
-                # If status code is outside 200s or 400s, it hasn't been implemented yet, don't display an alert
-                html = ""
+                params = tuple(request.segments()[1:])
+            self.prev_status = self.db.insert_game(Game(None, *params))
+        except (KeyError, TypeError, ValueError):
+            self.prev_status = 400
+        print(f'new status: {self.prev_status}')
+        self.events.publish('status', self.prev_status)
+        await Webserver._send(writer, self.prev_status, Webserver.status_codes[self.prev_status])
+
+    async def serve_page(self, writer, request: HttpRequest):
+        """
+        Reply with the page, gzipped from flash when it has been built and the browser can take it, or with 304 Not
+        Modified when the browser already has this version of the page. The page goes out as slices of its template
+        otherwise, nothing the size of the page is built either way.
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request
+        """
+        asset = self.assets.get('/')
+        if asset and Webserver._accepts_gzip(request):
+            # The page can change with a rebuild, so the browser has to check its tag before reusing it
+            await Webserver._send_asset(writer, request, asset, 'no-cache')
+            return
+
+        etag = self.page.etag('identity')
+        if request.headers.get('if-none-match') == etag:
+            await Webserver._send_all(writer, Webserver._headers(304, etag=etag))
+            return
+        await Webserver._send_all(writer, Webserver._headers(200, 'text/html; charset=utf-8', self.page.length({}),
+                                                             etag), *self.page.chunks({}))
+
+    async def serve_asset(self, writer, request: HttpRequest):
+        """
+        Reply with a built asset, gzipped when the browser can take it. Linked with the version the page gives it, the
+        asset can be kept by the browser for a year without asking again, since a rebuild links it with a new version.
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request, /static/<name>?v=<version>
+        """
+        asset = self.assets.get(request.path)
+        if asset is None:
+            await Webserver._send(writer, 404, f'No asset at {request.path}')
+            return
+
+        if request.query.get('v') == asset['tag']:
+            cache_control = f'public, max-age={Webserver.ASSET_MAX_AGE}, immutable'
         else:
-            html = ""
-        return html
+            cache_control = 'no-cache'
+        if Webserver._accepts_gzip(request):
+            await Webserver._send_asset(writer, request, asset, cache_control)
+            return
+
+        # The rare browser that can't take gzip gets the source file as it is
+        await Webserver._send_all(writer, Webserver._headers(200, asset['type'], os.stat(asset['source'])[6]))
+        await Webserver._send_file(writer, asset['source'])
+
+    @staticmethod
+    def _accepts_gzip(request: HttpRequest) -> bool:
+        """
+        Helper function for whether the client of a request can take a gzipped response
+
+        Args:
+            request: HttpRequest, the request
+
+        Returns:
+            bool: whether gzip is in the Accept-Encoding header
+        """
+        return 'gzip' in request.headers.get('accept-encoding', '')
+
+    @staticmethod
+    async def _send_asset(writer, request: HttpRequest, asset: dict, cache_control: str):
+        """
+        Helper function to reply with a gzipped asset from flash, or with 304 Not Modified when the browser already has
+        this version of it
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request
+            asset: dict, the asset's entry in the manifest
+            cache_control: str, value of the Cache-Control header
+        """
+        etag = f'"{asset["tag"]}"'
+        if request.headers.get('if-none-match') == etag:
+            await Webserver._send_all(writer, Webserver._headers(304, etag=etag, cache_control=cache_control))
+            return
+        await Webserver._send_all(writer, Webserver._headers(200, asset['type'], asset['length'], etag,
+                                                             cache_control=cache_control, encoding='gzip'))
+        await Webserver._send_file(writer, asset['file'])
+
+    @staticmethod
+    async def _send_file(writer, file_name: str):
+        """
+        Helper function to send a file from flash a fixed size chunk at a time, read into the same buffer each time
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            file_name: str, name of the file
+        """
+        buffer = bytearray(Webserver.STATIC_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(file_name, 'rb') as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                await Webserver._send_all(writer, view[:count])
+
+    @staticmethod
+    def _headers(status_code: int, content_type: str = None, length: int = 0, etag: str = None,
+                 chunked: bool = False, cache_control: str = 'no-cache', encoding: str = None) -> bytes:
+        """
+        Helper function to build the status line and headers of a response
+
+        Args:
+            status_code: int, status of the response, a key of status_codes
+            content_type: str, default None, type of the body, None when there is no body
+            length: int, default 0, number of bytes in the body
+            etag: str, default None, entity tag of the body, browsers revalidate it with If-None-Match before reusing it
+            chunked: bool, default False, whether the body is sent in chunks of its own length instead of with a length
+            cache_control: str, default 'no-cache', how long browsers may keep the body, only sent along with an etag
+            encoding: str, default None, encoding the body is compressed with, like gzip
+
+        Returns:
+            bytes: the status line and headers, ending with the empty line before the body
+        """
+        lines = [f'HTTP/1.1 {status_code} {Webserver.status_codes[status_code]}']
+        if content_type:
+            lines.append(f'Content-Type: {content_type}')
+        if chunked:
+            lines.append('Transfer-Encoding: chunked')
+        elif status_code != 304:
+            lines.append(f'Content-Length: {length}')
+        if encoding:
+            lines.append(f'Content-Encoding: {encoding}')
+        if etag:
+            # no-cache still lets the browser keep the page, it just has to check the tag is current before using it
+            lines.append(f'ETag: {etag}')
+            lines.append(f'Cache-Control: {cache_control}')
+            # The same path is sent gzipped or not depending on the browser, so caches must keep the two apart
+            lines.append('Vary: Accept-Encoding')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode()
+
+    @staticmethod
+    async def _send_all(writer, *chunks):
+        """
+        Helper function to send every byte of each chunk in order, draining after each one so no more than a chunk is
+        ever waiting in the stream's buffer
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            chunks: bytes or memoryview, the parts of the response
+        """
+        for chunk in chunks:
+            writer.write(chunk)
+            await writer.drain()
+
+    @staticmethod
+    async def _send(writer, status_code: int, message: str):
+        """
+        Helper function to reply with a status and a plain text message
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            status_code: int, status of the response, a key of status_codes
+            message: str, body of the response
+        """
+        body = message.encode()
+        await Webserver._send_all(writer, Webserver._headers(status_code, 'text/plain; charset=utf-8', len(body)), body)
+
+    async def serve_import(self, parser: HttpParser, reader, writer):
+        """
+        Import the games in the CSV file uploaded as the body of the request and reply with a summary. The body is
+        spooled to flash as it arrives, so the whole file is never held in memory, then imported a batch at a time with
+        the event loop running between batches.
 
-    def serve(self, connection, prev_status: int | None = None):
+        Args:
+            parser: HttpParser, parser of the connection, holding whatever of the body has been received
+            reader: asyncio.StreamReader, stream of the requests from the client
+            writer: asyncio.StreamWriter, stream of the responses to the client
+        """
+        with open(Webserver.UPLOAD_FILE, 'wb') as f:
+            while parser.body_remaining:
+                # Each part is written from the parser's buffer before the buffer is received into again
+                f.write(parser.take())
+                if parser.body_remaining and not await Webserver._receive(reader, parser):
+                    break
+
+        try:
+            imported, duplicates, invalid = 0, 0, 0
+            with open(Webserver.UPLOAD_FILE) as f:
+                for imported, duplicates, invalid in self.db.import_batches(f, Webserver.IMPORT_BATCH_SIZE):
+                    # Let the dial and the other clients have a turn between batches
+                    await asyncio.sleep(0)
+            # Created if anything was imported, a conflict if everything was already in the database
+            status_code = 201 if imported else 409 if duplicates else 400
+            message = f'Imported {imported} games, skipped {duplicates} duplicates and {invalid} invalid rows'
+        except ValueError as e:
+            status_code = 400
+            message = f'Could not import the file: {e}'
+        finally:
+            os.remove(Webserver.UPLOAD_FILE)
+
+        await Webserver._send(writer, status_code, message)
+
+    async def serve_metrics(self, writer):
+        """
+        Reply with the call counts and times of everything being timed, or not found when timing is disabled
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+        """
+        status_code = 200 if metrics.ENABLED else 404
+        message = metrics.report() if metrics.ENABLED else 'Timing is disabled in metrics.py'
+        await Webserver._send(writer, status_code, message)
+
+    async def serve_search(self, writer, request: HttpRequest):
         """
-        Serve the relevant HTML upon request from a client
+        Reply with the names of the games best matching the q parameter of the request, one per line
 
         Args:
-             connection: the connection created to the network and opened socket that is listening for requests
-             prev_status: int | None, integer value of a success/failure/error/etc message to be displayed
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request, /search?q=<search>
+        """
+        games = self.db.search_games(request.query.get('q', ''), Webserver.SEARCH_SIZE)
+        message = '\n'.join(game.name for game in games)
+        await Webserver._send(writer, 200, message)
+
+    async def serve_api_games(self, writer, request: HttpRequest):
+        """
+        Reply with a page of games as JSON, {"offset": .., "limit": .., "games": [..], "next": ..}, where next is the
+        offset of the next page or null on the last page. The games are read from the database and sent a chunk at a
+        time as they are reached, so neither the list of games nor the JSON is ever held whole, however large the
+        library.
+
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request, /api/games?offset=&limit=&players=&max_duration= with every parameter
+                optional
         """
         try:
-            print(f'status received: {prev_status}')
+            offset = int(request.query.get('offset') or 0)
+            limit = int(request.query.get('limit') or Webserver.API_PAGE_SIZE)
+            players = int(request.query.get('players') or 0)
+            max_duration = int(request.query.get('max_duration') or 0)
+            if offset < 0 or not 0 < limit <= Webserver.API_MAX_PAGE_SIZE or players < 0 or max_duration < 0:
+                raise ValueError
+        except ValueError:
+            await Webserver._send(writer, 400, f'Expected whole numbers of at least 0, with a limit from 1 to '
+                                               f'{Webserver.API_MAX_PAGE_SIZE}')
+            return
+
+        await Webserver._send_all(writer, Webserver._headers(200, 'application/json', chunked=True))
+        pending = [f'{{"offset": {offset}, "limit": {limit}, "games": [']
+        pending_length = len(pending[0])
+        listed = 0
+        more = False
+        # One game more than the page is read to tell whether there is a next page
+        for game in self.db.iter_games(offset, limit + 1, players, max_duration):
+            if listed == limit:
+                more = True
+                break
+            pending.append((',' if listed else '') + json.dumps({
+                'id': game.id, 'name': game.name, 'min_players': game.min_players, 'max_players': game.max_players,
+                'duration': game.duration, 'complexity': game.complexity}))
+            pending_length += len(pending[-1])
+            listed += 1
+            if pending_length >= Webserver.API_CHUNK_SIZE:
+                await Webserver._send_chunk(writer, ''.join(pending).encode())
+                pending = []
+                pending_length = 0
+        pending.append(f'], "next": {offset + limit if more else "null"}}}')
+        await Webserver._send_chunk(writer, ''.join(pending).encode())
+        # A chunk of no length ends the body
+        await Webserver._send_all(writer, b'0\r\n\r\n')
+
+    @staticmethod
+    async def _send_chunk(writer, data: bytes):
+        """
+        Helper function to send one chunk of a chunked body
 
-            # Get 1024 bytes of request from client
-            client = connection.accept()[0]
-            request = str(client.recv(1024))
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            data: bytes, the chunk, must not be empty since an empty chunk ends the body
+        """
+        await Webserver._send_all(writer, f'{len(data):x}\r\n'.encode(), data, b'\r\n')
 
-            try:
-                # Split the request if possible to the relevant information
-                request = request.split()[1]
-            except IndexError:
-                pass
+    async def _watch_events_client(self, reader, subscription):
+        """
+        Helper task to unsubscribe a browser listening for events as soon as it closes the connection, rather than once
+        an update fails to send to it
 
-            # TODO: this will be need to be removed eventually
-            print(request)
+        Args:
+            reader: asyncio.StreamReader, stream from the client, nothing more is expected on it
+            subscription: Subscription, the browser's subscription
+        """
+        try:
+            while await reader.read(64):
+                pass
+        except OSError:
+            pass
+        self.events.unsubscribe(subscription)
 
-            page = self.html.replace('%STATUS_MESSAGE%', self.create_status_alert(prev_status))
+    async def serve_events(self, reader, writer, request: HttpRequest):
+        """
+        Push the device's state as server-sent events, one JSON object of whatever changed for each update, starting
+        with everything set so far. A browser that can't keep up only ever has the latest value of each piece of state
+        waiting for it, and is dropped once an update takes too long to send, so it never holds up the device.
 
-            # Send the client the html and close request
-            client.send(page)
-            client.close()
+        Args:
+            reader: asyncio.StreamReader, stream from the client, watched for the browser closing the connection
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request
+        """
+        # The stream only ends when the connection does, so no request can follow it
+        request.keep_alive = False
+        if len(self.events) >= Webserver.MAX_EVENT_CLIENTS:
+            await Webserver._send(writer, 503, 'Too many pages are already listening for events')
+            return
+
+        subscription = self.events.subscribe()
+        watcher = asyncio.create_task(self._watch_events_client(reader, subscription))
+        try:
+            await Webserver._send_all(writer, Webserver._headers(200, 'text/event-stream', chunked=True))
+            while subscription.active:
+                try:
+                    await asyncio.wait_for(subscription.changed.wait(), Webserver.EVENT_PING_SECONDS)
+                except asyncio.TimeoutError:
+                    # A comment is ignored by the browser but fails to send once it has gone away
+                    await asyncio.wait_for(Webserver._send_chunk(writer, b': ping\n\n'), Webserver.EVENT_SEND_SECONDS)
+                    continue
+                # Let a burst of changes settle so they go out as one update
+                await asyncio.sleep(Webserver.EVENT_COALESCE_MS / 1000)
+                # Cleared before the changes are taken so a change made while sending wakes the loop again
+                subscription.changed.clear()
+                changes = self.events.take(subscription)
+                if changes:
+                    await asyncio.wait_for(Webserver._send_chunk(writer, f'data: {json.dumps(changes)}\n\n'.encode()),
+                                           Webserver.EVENT_SEND_SECONDS)
+        except (OSError, asyncio.TimeoutError):
+            # The browser went away or fell too far behind, it reconnects on its own once it can
+            pass
+        finally:
+            self.events.unsubscribe(subscription)
+            watcher.cancel()
+
+    async def serve_shortlist(self, writer, request: HttpRequest):
+        """
+        Reply with a shortlist of games for the players, duration and complexity in the request path, different random
+        games for /shortlist/ or the games closest to the duration for /closest/
 
-            # If game is in request, get the params from the request body
-            if request.find('/game/') != -1:
-                # %20 is the coding for a space so replace any with ' '
-                game_inputs = request[request.index('/game/') + len('/game/'):].replace('%20', ' ')
-                # Split the remaining request string by '/' and cast into a tuple
-                params = tuple(game_inputs.split('/'))
+        Args:
+            writer: asyncio.StreamWriter, stream of the response to the client
+            request: HttpRequest, the request, /shortlist/<players>/<duration>/<complexity> or the same for /closest/
+        """
+        try:
+            players, duration, complexity = request.segments()[1:4]
+            params = {'k': Webserver.SHORTLIST_SIZE, 'players': int(players), 'duration': int(duration),
+                      'complexity': complexity in ('1', 'true')}
+            if request.path.startswith('/closest/'):
+                games = self.db.rank_games(**params)
+            else:
+                games = self.db.get_random_games(**params)
+            status_code = 200 if games else 404
+            message = '\n'.join(game.name for game in games)
+        except ValueError:
+            status_code = 400
+            message = 'Expected /<players>/<duration>/<complexity>'
 
-                # TODO: This is where the DB will need to be called to insert the given game params
-                return params
-        except Exception as e:
-            print(f'An exception occurred while serving client: {e}')
+        await Webserver._send(writer, status_code, message)
 
     def __enter__(self):
         # Context manager override, set up the connection and IP attributes of the class
         self.ip = self.connect()
-        self.open_socket(self.ip)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        # Context manager override, always close connection on exiting context manager and print any exceptions
-        self.connection.close()
+        # Context manager override, always stop the server on exiting context manager and print any exceptions
+        if self.server:
+            self.server.close()
+        # Make sure no database writes held in memory are lost
+        if self.db:
+            self.db.flush()
         if exc_type:
             print(f'A {exc_type} exception forced the webserver to close: {exc_val}')
 